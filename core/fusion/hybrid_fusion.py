@@ -5,6 +5,9 @@
 该模块实现了混合融合引擎，能够根据任务特性和反馈特性自动选择最适合的融合策略。
 """
 
+import sys
+import numpy as np
+from types import MappingProxyType
 from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime
 
@@ -17,6 +20,12 @@ from .graph_fusion import GraphBasedFusion
 from .attention_fusion import AttentionBasedFusion
 from .rl_fusion import RLBasedFusion
 
+# 频繁比较的标签前缀和来源关键字，在模块加载时驻留一次
+_FUSION_STRATEGY_PREFIX = sys.intern("fusion_strategy:")
+_DOCTOR = sys.intern("doctor")
+_PATIENT = sys.intern("patient")
+_KNOWLEDGE = sys.intern("knowledge")
+
 class HybridFusionEngine:
     """
     混合融合引擎
@@ -24,6 +33,25 @@ class HybridFusionEngine:
     根据任务特性和反馈特性自动选择最适合的融合策略。
     """
     
+    # 任务类型到默认融合策略的映射
+    _DEFAULT_TASK_STRATEGY = MappingProxyType({
+        "long_term_optimization": "rl",     # 长期优化任务使用强化学习
+        "sequential_decision": "rl",
+        "diagnostic": "graph",              # 医疗相关任务使用图结构，因为关系很重要
+        "therapeutic": "graph",
+        "information_retrieval": "attention",  # 信息检索任务使用注意力机制
+        "question_answering": "attention",
+    })
+    
+    # (是否有医生反馈, 是否有患者反馈, 是否有知识库反馈) 到医疗领域推荐策略的映射
+    _MEDICAL_SOURCE_STRATEGY = MappingProxyType({
+        (True, True, False): "graph",       # 同时存在医生和患者反馈，使用图结构
+        (True, True, True): "graph",
+        (True, False, True): "graph",       # 存在知识库反馈和医生反馈，使用图结构
+        (True, False, False): "attention",  # 只有医生反馈，使用注意力机制
+        (False, True, False): "attention",  # 只有患者反馈，使用注意力机制
+    })
+    
     def __init__(self):
         """
         初始化混合融合引擎
@@ -34,8 +62,14 @@ class HybridFusionEngine:
             "rl": RLBasedFusion()
         }
         
-        # 策略选择历史记录，用于学习最佳策略
+        # 策略选择历史记录，用于学习最佳策略；
+        # 记录中不再包含feedback_types/feedback_sources名称列表，改为保存编码后的
+        # feedback_type_codes/feedback_source_codes，需要名称时使用get_history_record_details
         self.strategy_history = []
+        
+        # 历史记录中反馈类型和来源的编码表，记录中只保存编码后的字节串
+        self._value_codes: Dict[str, int] = {}
+        self._value_names: List[str] = []
     
     def select_strategy(self, feedbacks: List[FeedbackModel], task_type: str = None) -> str:
         """
@@ -69,14 +103,9 @@ class HybridFusionEngine:
             return "graph"
         
         # 检查任务类型
-        if task_type == "long_term_optimization" or task_type == "sequential_decision":
-            return "rl"  # 长期优化任务使用强化学习
-        elif task_type == "diagnostic" or task_type == "therapeutic":
-            # 医疗相关任务使用图结构，因为关系很重要
-            return "graph"
-        elif task_type == "information_retrieval" or task_type == "question_answering":
-            # 信息检索任务使用注意力机制
-            return "attention"
+        mapped = self._DEFAULT_TASK_STRATEGY.get(task_type)
+        if mapped:
+            return mapped
         
         # 检查反馈类型
         types = set()
@@ -116,10 +145,8 @@ class HybridFusionEngine:
             "strategy": strategy_name,
             "task_type": task_type,
             "num_feedbacks": len(feedbacks),
-            "feedback_types": [f.metadata.feedback_type.value if hasattr(f.metadata.feedback_type, 'value') 
-                              else str(f.metadata.feedback_type) for f in feedbacks],
-            "feedback_sources": [f.metadata.source.value if hasattr(f.metadata.source, 'value') 
-                               else str(f.metadata.source) for f in feedbacks]
+            "feedback_type_codes": self._encode_values(f.metadata.feedback_type for f in feedbacks),
+            "feedback_source_codes": self._encode_values(f.metadata.source for f in feedbacks)
         })
         
         # 执行融合
@@ -128,10 +155,63 @@ class HybridFusionEngine:
         # 添加融合策略信息
         if fused_feedback.metadata.tags is None:
             fused_feedback.metadata.tags = []
-        fused_feedback.metadata.tags.append(f"fusion_strategy:{strategy_name}")
+        fused_feedback.metadata.tags.append(f"{_FUSION_STRATEGY_PREFIX}{strategy_name}")
         
         return fused_feedback
     
+    def _encode_values(self, values) -> bytes:
+        """
+        将反馈类型或来源编码为紧凑的字节串
+        
+        Args:
+            values: 反馈类型或来源（枚举或字符串）的可迭代对象
+            
+        Returns:
+            bytes: uint16 编码数组的字节串
+        """
+        codes = []
+        for value in values:
+            name = value.value if hasattr(value, 'value') else str(value)
+            code = self._value_codes.get(name)
+            if code is None:
+                code = len(self._value_names)
+                self._value_codes[name] = code
+                self._value_names.append(name)
+            codes.append(code)
+        
+        return np.array(codes, dtype=np.uint16).tobytes()
+    
+    def _decode_values(self, codes: bytes) -> List[str]:
+        """
+        将编码后的字节串还原为反馈类型或来源名称
+        
+        Args:
+            codes: _encode_values 生成的字节串
+            
+        Returns:
+            List[str]: 名称列表
+        """
+        names = self._value_names
+        return [names[code] for code in np.frombuffer(codes, dtype=np.uint16).tolist()]
+    
+    def get_history_record_details(self, index: int) -> Dict[str, Any]:
+        """
+        获取展开后的策略历史记录
+        
+        strategy_history中的记录只保存编码后的反馈类型和来源，原先的feedback_types和feedback_sources
+        字段已移除，由本方法代替读取。
+        
+        Args:
+            index: 历史记录下标
+            
+        Returns:
+            Dict[str, Any]: 包含反馈类型和来源名称列表的历史记录副本
+        """
+        record = dict(self.strategy_history[index])
+        record["feedback_types"] = self._decode_values(record.pop("feedback_type_codes"))
+        record["feedback_sources"] = self._decode_values(record.pop("feedback_source_codes"))
+        return record
+    
     def analyze_strategy_performance(self) -> Dict[str, Any]:
         """
         分析不同策略的性能
@@ -208,12 +288,7 @@ class HybridFusionEngine:
             return max(strategy_counts, key=strategy_counts.get)
         
         # 默认策略
-        if task_type == "long_term_optimization" or task_type == "sequential_decision":
-            return "rl"
-        elif task_type == "diagnostic" or task_type == "therapeutic":
-            return "graph"
-        else:
-            return "attention"
+        return self._DEFAULT_TASK_STRATEGY.get(task_type, "attention")
 
     def evaluate_strategy_performance(self, feedback: FeedbackModel, actual_outcome: float) -> None:
         """
@@ -226,8 +301,9 @@ class HybridFusionEngine:
         # 从反馈标签中提取融合策略
         strategy = None
         for tag in feedback.metadata.tags:
-            if tag.startswith("fusion_strategy:"):
-                strategy = tag.split(":")[1]
+            if tag.startswith(_FUSION_STRATEGY_PREFIX):
+                # 驻留策略名，使其与历史记录中的策略名为同一对象，比较时走快速路径
+                strategy = sys.intern(tag.split(":")[1])
                 break
         
         if not strategy or not self.strategy_history:
@@ -257,31 +333,17 @@ class HybridFusionEngine:
         for feedback in feedbacks:
             if hasattr(feedback.metadata.source, 'value'):
                 source_value = feedback.metadata.source.value
-                if 'doctor' in source_value:
+                if _DOCTOR in source_value:
                     has_doctor_feedback = True
-                elif 'patient' in source_value:
+                elif _PATIENT in source_value:
                     has_patient_feedback = True
-                elif 'knowledge' in source_value:
+                elif _KNOWLEDGE in source_value:
                     has_knowledge_feedback = True
         
-        # 如果同时存在医生和患者反馈，使用图结构
-        if has_doctor_feedback and has_patient_feedback:
-            return "graph"
-        
-        # 如果存在知识库反馈和医生反馈，使用图结构
-        if has_knowledge_feedback and has_doctor_feedback:
-            return "graph"
-        
-        # 如果只有医生反馈，使用注意力机制
-        if has_doctor_feedback and not has_patient_feedback and not has_knowledge_feedback:
-            return "attention"
-        
-        # 如果只有患者反馈，使用注意力机制
-        if has_patient_feedback and not has_doctor_feedback and not has_knowledge_feedback:
-            return "attention"
-        
-        # 默认返回None，表示没有特定推荐
-        return None
+        # 按来源组合查表，没有特定推荐时返回None
+        return self._MEDICAL_SOURCE_STRATEGY.get(
+            (has_doctor_feedback, has_patient_feedback, has_knowledge_feedback)
+        )
     
     def analyze_feedback_patterns(self, feedbacks: List[FeedbackModel]) -> Dict[str, Any]:
         """
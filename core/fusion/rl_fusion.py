@@ -5,10 +5,14 @@
 该模块实现了基于强化学习的反馈融合策略，适用于长期优化和序列决策任务。
 """
 
+import io
 import numpy as np
 from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime
 import random
+import sys
+import time
+from collections import defaultdict
 
 from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel, SourceType, FeedbackType
@@ -16,6 +20,13 @@ from ...models.content_model import ContentModel, TextContent, StructuredContent
 from ...models.relation_model import RelationModel, RelationType
 from .fusion import FeedbackFusion
 
+# 频繁比较的来源关键字和融合标签，在模块加载时驻留一次
+_DOCTOR = sys.intern("doctor")
+_PATIENT = sys.intern("patient")
+_SYSTEM = sys.intern("system")
+_KNOWLEDGE = sys.intern("knowledge")
+_FUSION_METHOD_TAG = sys.intern("fusion_method:rl")
+
 class RLBasedFusion(FeedbackFusion):
     """
     基于强化学习的反馈融合
@@ -23,6 +34,16 @@ class RLBasedFusion(FeedbackFusion):
     使用强化学习方法动态调整反馈权重，适用于长期优化和序列决策任务。
     """
     
+    # 动作空间（权重分配策略）名称，顺序固定
+    _ACTION_NAMES = ("uniform", "reliability", "recency", "source", "feedback_type")
+    _ACTION_INDEX = {name: i for i, name in enumerate(_ACTION_NAMES)}
+    
+    # 关系类型对奖励的贡献方向：支持关系惩罚权重差异，反对关系奖励权重差异
+    _RELATION_SIGN = {RelationType.SUPPORT: -1.0, RelationType.OPPOSE: 1.0}
+    
+    # Q矩阵初始预分配的状态行数
+    _INITIAL_Q_ROWS = 16
+    
     def __init__(self, learning_rate: float = 0.01, discount_factor: float = 0.9, 
                  exploration_rate: float = 0.1, history_window: int = 10):
         """
@@ -39,12 +60,17 @@ class RLBasedFusion(FeedbackFusion):
         self.exploration_rate = exploration_rate
         self.history_window = history_window
         
-        # Q值表，用于存储状态-动作对的价值估计
-        self.q_table = {}
+        # Q值矩阵，用于存储状态-动作对的价值估计，每行对应一个状态，各列按 _ACTION_NAMES 排列
+        self._state_id: Dict[str, int] = {}
+        # 预分配若干行，容量不足时按倍数扩容，已使用的行数等于 len(self._state_id)
+        self._q_matrix = np.zeros((self._INITIAL_Q_ROWS, len(self._ACTION_NAMES)), dtype=np.float32)
         
-        # 历史记录，用于存储过去的状态、动作和奖励
+        # 历史记录，用于存储过去的状态行号、动作下标和奖励
         self.history = []
         
+        # 当前融合调用开始时的时间戳（秒），在 fuse() 中每次调用只取一次
+        self._now_epoch: Optional[float] = None
+        
         # 反馈特征提取器
         self.feature_extractors = {
             'reliability': lambda f: f.get_reliability(),
@@ -55,6 +81,37 @@ class RLBasedFusion(FeedbackFusion):
             'content_length': self._extract_content_length
         }
     
+    @property
+    def q_table(self) -> Dict[str, np.ndarray]:
+        """
+        Q表视图
+        
+        Returns:
+            Dict[str, np.ndarray]: 状态到Q值数组（Q矩阵中对应行）的映射
+        """
+        return {state: self._q_matrix[row] for state, row in self._state_id.items()}
+    
+    def _row(self, state: str) -> int:
+        """
+        获取状态在Q矩阵中的行号，新状态占用下一行初始为0的Q值
+        
+        Args:
+            state: 状态表示
+            
+        Returns:
+            int: Q矩阵行号
+        """
+        row = self._state_id.get(state)
+        if row is None:
+            row = len(self._state_id)
+            self._state_id[state] = row
+            if row == len(self._q_matrix):
+                # 容量翻倍，新增行初始化为0
+                grown = np.zeros((2 * row, self._q_matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self._q_matrix
+                self._q_matrix = grown
+        return row
+    
     def _extract_recency(self, feedback: FeedbackModel) -> float:
         """
         提取反馈的时效性特征
@@ -65,7 +122,8 @@ class RLBasedFusion(FeedbackFusion):
         Returns:
             float: 时效性特征值，范围[0,1]，越新的反馈值越高
         """
-        time_diff = (datetime.now() - feedback.metadata.timestamp).total_seconds() / 86400  # 转换为天数
+        now_epoch = self._now_epoch if self._now_epoch is not None else time.time()
+        time_diff = (now_epoch - feedback.metadata.timestamp.timestamp()) / 86400  # 转换为天数
         return max(0, 1 - (time_diff / 30))  # 一个月内的反馈时效性从1线性降至0
     
     def _extract_source_type(self, feedback: FeedbackModel) -> float:
@@ -80,13 +138,13 @@ class RLBasedFusion(FeedbackFusion):
         """
         if hasattr(feedback.metadata.source, 'value'):
             source_value = feedback.metadata.source.value
-            if 'doctor' in source_value:
+            if _DOCTOR in source_value:
                 return 0.9
-            elif 'patient' in source_value:
+            elif _PATIENT in source_value:
                 return 0.7
-            elif 'system' in source_value:
+            elif _SYSTEM in source_value:
                 return 0.8
-            elif 'knowledge' in source_value:
+            elif _KNOWLEDGE in source_value:
                 return 0.85
         return 0.5  # 默认值
     
@@ -136,39 +194,35 @@ class RLBasedFusion(FeedbackFusion):
         Returns:
             str: 状态表示，用于Q表索引
         """
-        # 提取反馈类型分布
+        # 单次遍历同时统计反馈类型分布、来源分布和关系总数
         feedback_types = {}
-        for feedback in feedbacks:
-            if hasattr(feedback.metadata.feedback_type, 'value'):
-                type_value = feedback.metadata.feedback_type.value
-                if type_value not in feedback_types:
-                    feedback_types[type_value] = 0
-                feedback_types[type_value] += 1
-        
-        # 提取反馈来源分布
         source_types = {}
+        relation_count = 0
         for feedback in feedbacks:
-            if hasattr(feedback.metadata.source, 'value'):
-                source_value = feedback.metadata.source.value
-                if source_value not in source_types:
-                    source_types[source_value] = 0
-                source_types[source_value] += 1
-        
-        # 计算反馈关系密度
-        relation_count = sum(len(f.relations) for f in feedbacks)
-        relation_density = relation_count / (len(feedbacks) * (len(feedbacks) - 1)) if len(feedbacks) > 1 else 0
+            metadata = feedback.metadata
+            if hasattr(metadata.feedback_type, 'value'):
+                type_value = metadata.feedback_type.value
+                feedback_types[type_value] = feedback_types.get(type_value, 0) + 1
+            if hasattr(metadata.source, 'value'):
+                source_value = metadata.source.value
+                source_types[source_value] = source_types.get(source_value, 0) + 1
+            relation_count += len(feedback.relations)
+        
+        # 计算反馈关系密度分桶（整数运算，等价于 int(density * 10)，上限为10）
+        n = len(feedbacks)
+        density_bucket = min(10, (relation_count * 10) // (n * (n - 1))) if n > 1 else 0
         
         # 构建状态字符串
         state_parts = [
             f"types:{','.join(f'{k}:{v}' for k, v in sorted(feedback_types.items())[:3])}",
             f"sources:{','.join(f'{k}:{v}' for k, v in sorted(source_types.items())[:3])}",
-            f"density:{int(relation_density * 10)}",
-            f"count:{len(feedbacks)}"
+            f"density:{density_bucket}",
+            f"count:{n}"
         ]
         
         return "|".join(state_parts)
     
-    def _get_possible_actions(self, feedbacks: List[FeedbackModel]) -> List[Tuple[str, List[float]]]:
+    def _get_possible_actions(self, feedbacks: List[FeedbackModel]) -> List[Tuple[str, np.ndarray]]:
         """
         获取可能的动作列表
         
@@ -176,60 +230,46 @@ class RLBasedFusion(FeedbackFusion):
             feedbacks: 反馈列表
             
         Returns:
-            List[Tuple[str, List[float]]]: 动作列表，每个动作是一个元组，包含动作名称和权重列表
+            List[Tuple[str, np.ndarray]]: 动作列表，每个动作是一个元组，包含动作名称和权重向量
         """
         n = len(feedbacks)
-        
-        # 定义几种权重分配策略
-        actions = [
-            ("uniform", [1.0/n] * n),  # 均匀分配
-            ("reliability", [self.feature_extractors['reliability'](f) for f in feedbacks]),  # 按可靠性分配
-            ("recency", [self.feature_extractors['recency'](f) for f in feedbacks]),  # 按时效性分配
-            ("source", [self.feature_extractors['source_type'](f) for f in feedbacks]),  # 按来源分配
-            ("feedback_type", [self.feature_extractors['feedback_type'](f) for f in feedbacks])  # 按反馈类型分配
-        ]
-        
-        # 归一化权重
-        normalized_actions = []
-        for name, weights in actions:
-            sum_weights = sum(weights)
-            if sum_weights > 0:
-                normalized_weights = [w / sum_weights for w in weights]
-            else:
-                normalized_weights = [1.0/n] * n  # 如果所有权重都为0，则均匀分配
-            normalized_actions.append((name, normalized_weights))
-        
-        return normalized_actions
+        extractors = self.feature_extractors
+        
+        # 定义几种权重分配策略，每行对应 _ACTION_NAMES 中的一个动作
+        weight_matrix = np.empty((len(self._ACTION_NAMES), n), dtype=np.float64)
+        weight_matrix[0] = 1.0 / n  # 均匀分配
+        weight_matrix[1] = [extractors['reliability'](f) for f in feedbacks]  # 按可靠性分配
+        weight_matrix[2] = [extractors['recency'](f) for f in feedbacks]  # 按时效性分配
+        weight_matrix[3] = [extractors['source_type'](f) for f in feedbacks]  # 按来源分配
+        weight_matrix[4] = [extractors['feedback_type'](f) for f in feedbacks]  # 按反馈类型分配
+        
+        # 按行归一化权重，如果某行权重和为0，则均匀分配
+        row_sums = weight_matrix.sum(axis=1, keepdims=True)
+        weight_matrix = np.divide(weight_matrix, row_sums,
+                                  out=np.full_like(weight_matrix, 1.0 / n),
+                                  where=row_sums > 0)
+        
+        return list(zip(self._ACTION_NAMES, weight_matrix))
     
-    def _select_action(self, state: str, possible_actions: List[Tuple[str, List[float]]]) -> Tuple[str, List[float]]:
+    def _select_action(self, state_row: int, possible_actions: List[Tuple[str, np.ndarray]]) -> Tuple[str, np.ndarray]:
         """
         选择动作
         
         Args:
-            state: 当前状态
+            state_row: 当前状态在Q矩阵中的行号
             possible_actions: 可能的动作列表
             
         Returns:
-            Tuple[str, List[float]]: 选择的动作，包含动作名称和权重列表
+            Tuple[str, np.ndarray]: 选择的动作，包含动作名称和权重向量
         """
         # 探索：随机选择动作
         if random.random() < self.exploration_rate:
             return random.choice(possible_actions)
         
         # 利用：选择Q值最高的动作
-        if state not in self.q_table:
-            self.q_table[state] = {action[0]: 0.0 for action in possible_actions}
-        
-        q_values = self.q_table[state]
-        best_action_name = max(q_values, key=q_values.get)
-        
-        # 找到对应的动作
-        for action_name, weights in possible_actions:
-            if action_name == best_action_name:
-                return (action_name, weights)
-        
-        # 如果找不到（可能是因为动作空间变化），则随机选择
-        return random.choice(possible_actions)
+        # 动作列表与Q矩阵的列按 _ACTION_NAMES 对齐，直接按下标取出
+        best_index = int(self._q_matrix[state_row].argmax())
+        return possible_actions[best_index]
     
     def _calculate_reward(self, feedbacks: List[FeedbackModel], weights: List[float]) -> float:
         """
@@ -252,56 +292,43 @@ class RLBasedFusion(FeedbackFusion):
             reliability = self.feature_extractors['reliability'](feedback)
             reward += weights[i] * reliability
         
-        # 奖励关系一致性
-        for i, feedback1 in enumerate(feedbacks):
-            for j, feedback2 in enumerate(feedbacks):
-                if i != j:
-                    # 检查是否存在支持关系
-                    support_relation = False
-                    for relation in feedback1.relations:
-                        if relation.target_id == feedback2.feedback_id and relation.relation_type == RelationType.SUPPORT:
-                            support_relation = True
-                            # 如果存在支持关系，权重应该相近
-                            weight_diff = abs(weights[i] - weights[j])
-                            reward -= weight_diff * relation.strength
-                    
-                    # 检查是否存在反对关系
-                    oppose_relation = False
-                    for relation in feedback1.relations:
-                        if relation.target_id == feedback2.feedback_id and relation.relation_type == RelationType.OPPOSE:
-                            oppose_relation = True
-                            # 如果存在反对关系，权重应该差异大
-                            weight_diff = abs(weights[i] - weights[j])
-                            reward += weight_diff * relation.strength
+        # 奖励关系一致性：支持关系的权重应该相近，反对关系的权重应该差异大
+        index_by_id = {}
+        for j, feedback in enumerate(feedbacks):
+            index_by_id.setdefault(feedback.feedback_id, []).append(j)
+        
+        for i, feedback in enumerate(feedbacks):
+            for relation in feedback.relations:
+                sign = self._RELATION_SIGN.get(relation.relation_type, 0.0)
+                if not sign:
+                    continue
+                for j in index_by_id.get(relation.target_id, ()):
+                    if i != j:
+                        reward += sign * relation.strength * abs(weights[i] - weights[j])
         
         return reward
     
-    def _update_q_value(self, state: str, action_name: str, reward: float, next_state: str) -> None:
+    def _update_q_values(self) -> None:
         """
-        更新Q值
+        基于历史窗口批量更新Q值
         
-        Args:
-            state: 当前状态
-            action_name: 动作名称
-            reward: 奖励
-            next_state: 下一个状态
+        历史中相邻的两条记录构成一次转移 (状态, 动作, 奖励, 下一个状态)，
+        所有转移的Q-learning更新在Q矩阵上一次性完成。
         """
-        if state not in self.q_table:
-            self.q_table[state] = {}
+        count = len(self.history)
+        rows = np.fromiter((record[0] for record in self.history), dtype=np.intp, count=count)
+        actions = np.fromiter((record[1] for record in self.history), dtype=np.intp, count=count)
+        rewards = np.fromiter((record[2] for record in self.history), dtype=np.float64, count=count)
         
-        if action_name not in self.q_table[state]:
-            self.q_table[state][action_name] = 0.0
+        state_rows, action_indices = rows[:-1], actions[:-1]
         
         # 计算下一个状态的最大Q值
-        if next_state in self.q_table:
-            max_next_q = max(self.q_table[next_state].values()) if self.q_table[next_state] else 0.0
-        else:
-            max_next_q = 0.0
+        max_next_q = self._q_matrix[rows[1:]].max(axis=1)
         
-        # Q-learning更新公式
-        current_q = self.q_table[state][action_name]
-        new_q = current_q + self.learning_rate * (reward + self.discount_factor * max_next_q - current_q)
-        self.q_table[state][action_name] = new_q
+        # Q-learning更新公式，同一状态-动作对的多次更新累加
+        current_q = self._q_matrix[state_rows, action_indices]
+        deltas = self.learning_rate * (rewards[:-1] + self.discount_factor * max_next_q - current_q)
+        np.add.at(self._q_matrix, (state_rows, action_indices), deltas.astype(np.float32))
     
     def _fuse_content(self, feedbacks: List[FeedbackModel], weights: List[float]) -> ContentModel:
         """
@@ -316,51 +343,89 @@ class RLBasedFusion(FeedbackFusion):
         """
         # 检查内容类型
         content_types = set(f.content.content_type for f in feedbacks)
+        weights = np.asarray(weights, dtype=np.float64)
+        
+        # 预先计算权重大于阈值的反馈下标，避免逐个比较
+        active_indices = np.nonzero(weights > 0.05)[0]
         
         # 如果所有反馈都是文本类型
         if len(content_types) == 1 and list(content_types)[0] == 'text':
             # 加权融合文本内容
-            text_parts = []
-            for i, feedback in enumerate(feedbacks):
-                if weights[i] > 0.05:  # 只考虑权重大于阈值的反馈
-                    text = feedback.content.text
-                    text_parts.append(f"({weights[i]:.2f}) {text}")
-            
-            fused_text = "\n\n".join(text_parts)
+            fused_text = self._write_weighted_text(
+                (weights[i], feedbacks[i].content.text) for i in active_indices
+            )
             return TextContent(text=fused_text)
         
         # 如果所有反馈都是结构化数据类型
         elif len(content_types) == 1 and list(content_types)[0] == 'structured':
             # 加权融合结构化数据
-            fused_data = {}
-            for i, feedback in enumerate(feedbacks):
-                if weights[i] > 0.05:  # 只考虑权重大于阈值的反馈
-                    data = feedback.content.data
-                    for key, value in data.items():
-                        if key not in fused_data:
-                            fused_data[key] = value * weights[i]
-                        else:
-                            fused_data[key] += value * weights[i]
+            datas = [feedbacks[i].content.data for i in active_indices]
+            keys = list(datas[0]) if datas else []
+            key_set = set(keys)
+            
+            # 所有反馈的键一致且值均为数值时，使用矩阵乘法一次完成加权求和
+            if keys and all(
+                data.keys() == key_set
+                and all(isinstance(value, (int, float)) for value in data.values())
+                for data in datas
+            ):
+                matrix = np.array([[data[key] for key in keys] for data in datas], dtype=np.float64)
+                fused_vec = weights[active_indices] @ matrix
+                return StructuredContent(data=dict(zip(keys, fused_vec.tolist())))
+            
+            # 数据结构不一致时逐键累加
+            fused_data = defaultdict(float)
+            for weight, data in zip(weights[active_indices].tolist(), datas):
+                for key, value in data.items():
+                    fused_data[key] += value * weight
             
-            return StructuredContent(data=fused_data)
+            return StructuredContent(data=dict(fused_data))
         
         # 如果反馈类型混合，转换为文本进行融合
         else:
-            text_parts = []
-            for i, feedback in enumerate(feedbacks):
-                if weights[i] > 0.05:  # 只考虑权重大于阈值的反馈
-                    if hasattr(feedback.content, 'text'):
-                        text = feedback.content.text
-                    elif hasattr(feedback.content, 'data'):
-                        text = str(feedback.content.data)
-                    else:
-                        text = str(feedback.content)
-                    
-                    text_parts.append(f"({weights[i]:.2f}) {text}")
-            
-            fused_text = "\n\n".join(text_parts)
+            fused_text = self._write_weighted_text(
+                (weights[i], self._content_to_text(feedbacks[i].content)) for i in active_indices
+            )
             return TextContent(text=fused_text)
     
+    @staticmethod
+    def _content_to_text(content: ContentModel) -> str:
+        """
+        将任意类型的内容转换为文本
+        
+        Args:
+            content: 反馈内容
+            
+        Returns:
+            str: 内容的文本表示
+        """
+        if hasattr(content, 'text'):
+            return content.text
+        elif hasattr(content, 'data'):
+            return str(content.data)
+        return str(content)
+    
+    @staticmethod
+    def _write_weighted_text(weighted_texts) -> str:
+        """
+        将带权重的文本依次写入缓冲区，段落之间以空行分隔
+        
+        Args:
+            weighted_texts: (权重, 文本) 的可迭代对象
+            
+        Returns:
+            str: 融合后的文本
+        """
+        buf = io.StringIO()
+        separator = ""
+        for weight, text in weighted_texts:
+            buf.write(separator)
+            buf.write(f"({weight:.2f}) ")
+            buf.write(text)
+            separator = "\n\n"
+        
+        return buf.getvalue()
+    
     def fuse(self, feedbacks: List[FeedbackModel]) -> FeedbackModel:
         """
         融合反馈
@@ -374,58 +439,62 @@ class RLBasedFusion(FeedbackFusion):
         if not feedbacks:
             raise ValueError("No feedbacks to fuse")
         
-        # 提取当前状态
-        current_state = self._extract_state(feedbacks)
-        
-        # 获取可能的动作
-        possible_actions = self._get_possible_actions(feedbacks)
-        
-        # 选择动作
-        action_name, weights = self._select_action(current_state, possible_actions)
-        
-        # 计算奖励
-        reward = self._calculate_reward(feedbacks, weights)
-        
-        # 更新历史记录
-        self.history.append((current_state, action_name, reward))
-        if len(self.history) > self.history_window:
-            self.history.pop(0)
-        
-        # 如果历史记录中有足够的数据，更新Q值
-        if len(self.history) >= 2:
-            for i in range(len(self.history) - 1):
-                prev_state, prev_action, prev_reward = self.history[i]
-                next_state, _, _ = self.history[i + 1]
-                self._update_q_value(prev_state, prev_action, prev_reward, next_state)
-        
-        # 融合内容
-        fused_content = self._fuse_content(feedbacks, weights)
-        
-        # 创建融合后的反馈
-        fused_feedback = FeedbackModel(
-            feedback_id=f"fused_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            content=fused_content,
-            metadata=MetadataModel(
-                timestamp=datetime.now(),
-                source=SourceType.SYSTEM,
-                feedback_type=FeedbackType.FUSED,
-                reliability=sum(f.get_reliability() * w for f, w in zip(feedbacks, weights)),
-                tags=[f"fusion_method:rl", f"action:{action_name}", f"reward:{reward:.2f}"]
-            ),
-            relations=[]
-        )
-        
-        # 添加与原始反馈的关系
-        for feedback in feedbacks:
-            relation = RelationModel(
-                source_id=fused_feedback.feedback_id,
-                target_id=feedback.feedback_id,
-                relation_type=RelationType.DERIVED_FROM,
-                strength=1.0
+        # 本次融合中所有时效性特征共用同一个当前时间，融合结束后清除，
+        # 此后单独提取特征时重新读取当前时间
+        self._now_epoch = time.time()
+        try:
+            # 提取当前状态
+            current_state = self._extract_state(feedbacks)
+            state_row = self._row(current_state)
+            
+            # 获取可能的动作
+            possible_actions = self._get_possible_actions(feedbacks)
+            
+            # 选择动作
+            action_name, weights = self._select_action(state_row, possible_actions)
+            
+            # 计算奖励
+            reward = self._calculate_reward(feedbacks, weights)
+            
+            # 更新历史记录
+            self.history.append((state_row, self._ACTION_INDEX[action_name], reward))
+            if len(self.history) > self.history_window:
+                self.history.pop(0)
+            
+            # 如果历史记录中有足够的数据，更新Q值
+            if len(self.history) >= 2:
+                self._update_q_values()
+            
+            # 融合内容
+            fused_content = self._fuse_content(feedbacks, weights)
+            
+            # 创建融合后的反馈
+            fused_feedback = FeedbackModel(
+                feedback_id=f"fused_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                content=fused_content,
+                metadata=MetadataModel(
+                    timestamp=datetime.now(),
+                    source=SourceType.SYSTEM,
+                    feedback_type=FeedbackType.FUSED,
+                    reliability=sum(f.get_reliability() * w for f, w in zip(feedbacks, weights)),
+                    tags=[_FUSION_METHOD_TAG, f"action:{action_name}", f"reward:{reward:.2f}"]
+                ),
+                relations=[]
             )
-            fused_feedback.relations.append(relation)
-        
-        return fused_feedback
+            
+            # 添加与原始反馈的关系
+            for feedback in feedbacks:
+                relation = RelationModel(
+                    source_id=fused_feedback.feedback_id,
+                    target_id=feedback.feedback_id,
+                    relation_type=RelationType.DERIVED_FROM,
+                    strength=1.0
+                )
+                fused_feedback.relations.append(relation)
+            
+            return fused_feedback
+        finally:
+            self._now_epoch = None
     
     def get_q_table_summary(self) -> Dict[str, Any]:
         """
@@ -434,18 +503,17 @@ class RLBasedFusion(FeedbackFusion):
         Returns:
             Dict[str, Any]: Q表摘要信息
         """
-        if not self.q_table:
+        if not self._state_id:
             return {"message": "Q表为空"}
         
         # 计算每个状态的最佳动作
         best_actions = {}
-        for state, actions in self.q_table.items():
-            if actions:
-                best_action = max(actions.items(), key=lambda x: x[1])
-                best_actions[state] = {
-                    "action": best_action[0],
-                    "q_value": best_action[1]
-                }
+        for state, row in self._state_id.items():
+            best_index = int(self._q_matrix[row].argmax())
+            best_actions[state] = {
+                "action": self._ACTION_NAMES[best_index],
+                "q_value": float(self._q_matrix[row, best_index])
+            }
         
         # 计算每个动作被选为最佳的次数
         action_counts = {}
@@ -456,7 +524,7 @@ class RLBasedFusion(FeedbackFusion):
             action_counts[action] += 1
         
         return {
-            "total_states": len(self.q_table),
+            "total_states": len(self._state_id),
             "best_actions": best_actions,
             "action_counts": action_counts
         }
@@ -8,12 +8,99 @@
 from typing import Dict, List, Optional, Union, Any
 from abc import ABC, abstractmethod
 import re
+import sys
 import json
-from datetime import datetime
+import functools
+import time
+from operator import itemgetter
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装 pyahocorasick 时退回逐词子串匹配
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # 未安装 google-re2 时使用 re 编译噪声模式
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:  # 未安装 hyperscan 时使用 re 进行噪声模式匹配
+    hyperscan = None
 
 from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel
-from ...models.content_model import ContentModel, TextContent, StructuredContent
+from ...models.content_model import ContentModel, CONTENT_KIND_TEXT, CONTENT_KIND_STRUCTURED
+
+# 未转义的 Perl 字符类（\d、\w、\s、\b 及其取反形式）；RE2 中这些字符类只匹配 ASCII 字符，re 中匹配 Unicode 字符
+_PERL_CLASS_RE = re.compile(r'(?<!\\)(?:\\\\)*\\[dDwWsSbB]')
+
+def _clean(text: str) -> str:
+    """
+    去除首尾空白并将连续空白合并为单个空格，只遍历一次字符串
+    
+    Args:
+        text: 原始文本
+        
+    Returns:
+        str: 清理后的文本
+    """
+    return ' '.join(text.split())
+
+@functools.lru_cache(maxsize=32)
+def _compile_noise_regex(patterns: tuple) -> Any:
+    """
+    编译噪声模式，最近使用的模式组合在进程内缓存，无需重复编译
+    
+    优先使用线性时间匹配的 RE2，避免用户输入触发回溯导致的性能问题。模式含有 Perl 字符类时
+    使用 re，RE2 中这些字符类只匹配 ASCII，会漏掉全角数字等中文文本中常见的字符。
+    
+    Args:
+        patterns: 噪声模式元组
+        
+    Returns:
+        Any: 合并后的噪声正则表达式（re2 或 re 的编译结果）
+    """
+    pattern = '|'.join(patterns)
+    if re2 is not None and not _PERL_CLASS_RE.search(pattern):
+        try:
+            return re2.compile('(?i)' + pattern)
+        except re2.error:
+            # 模式使用了 RE2 不支持的语法（如反向引用），退回 re
+            pass
+    
+    return re.compile(pattern, re.IGNORECASE)
+
+@functools.lru_cache(maxsize=32)
+def _compile_noise_db(patterns: tuple):
+    """
+    将噪声模式编译为 Hyperscan 数据库，最近使用的模式组合在进程内缓存
+    
+    Args:
+        patterns: 噪声模式元组
+        
+    Returns:
+        hyperscan.Database: 编译后的数据库，未安装 hyperscan 或模式不受支持时返回None
+    """
+    if hyperscan is None:
+        return None
+    
+    # HS_FLAG_UCP 使 \d、\w、\s 按 Unicode 字符匹配，与 re 的行为一致
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.encode('utf-8') for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[flags] * len(patterns)
+        )
+    except Exception as e:
+        print(f"Error compiling noise patterns with hyperscan: {e}")
+        return None
+    
+    return db
 
 class FeedbackProcessor(ABC):
     """
@@ -22,6 +109,20 @@ class FeedbackProcessor(ABC):
     定义反馈处理的通用接口，所有具体处理器都应继承此类。
     """
     
+    # 处理器属性固定，使用 __slots__ 避免实例字典
+    __slots__ = ()
+    
+    # 处理记录中的操作名称，由具体处理器定义
+    OPERATION = 'processing'
+    
+    def __init_subclass__(cls, **kwargs):
+        """
+        创建子类时驻留处理器名称和操作名称，所有处理记录共用同一个字符串对象
+        """
+        super().__init_subclass__(**kwargs)
+        cls._processor_name = sys.intern(cls.__name__)
+        cls.OPERATION = sys.intern(cls.OPERATION)
+    
     @abstractmethod
     def process(self, feedback: FeedbackModel) -> FeedbackModel:
         """
@@ -34,6 +135,20 @@ class FeedbackProcessor(ABC):
             FeedbackModel: 处理后的反馈
         """
         pass
+    
+    def process_batch(self, feedbacks: List[FeedbackModel]) -> List[FeedbackModel]:
+        """
+        批量处理反馈
+        
+        默认逐个调用process，子类可以重写以一次性处理整批文本。
+        
+        Args:
+            feedbacks: 原始反馈列表
+            
+        Returns:
+            List[FeedbackModel]: 处理后的反馈列表
+        """
+        return [self.process(feedback) for feedback in feedbacks]
 
 class TextNormalizationProcessor(FeedbackProcessor):
     """
@@ -42,6 +157,10 @@ class TextNormalizationProcessor(FeedbackProcessor):
     对文本反馈进行标准化处理，包括去除多余空格、统一标点符号等。
     """
     
+    __slots__ = ('punctuation_map', '_trans')
+    
+    OPERATION = 'text_normalization'
+    
     def __init__(self):
         """
         初始化文本标准化处理器
@@ -54,9 +173,10 @@ class TextNormalizationProcessor(FeedbackProcessor):
             '：': ':',
             '？': '?',
             '！': '!',
-            '"': '"',
-            ''': '\'',
-            ''': '\'',
+            '“': '"',
+            '”': '"',
+            '‘': '\'',
+            '’': '\'',
             '（': '(',
             '）': ')',
             '【': '[',
@@ -64,6 +184,9 @@ class TextNormalizationProcessor(FeedbackProcessor):
             '《': '<',
             '》': '>'
         }
+        
+        # 由标点符号映射生成的转换表，一次遍历完成全部替换
+        self._trans = str.maketrans(self.punctuation_map)
     
     def process(self, feedback: FeedbackModel) -> FeedbackModel:
         """
@@ -76,7 +199,7 @@ class TextNormalizationProcessor(FeedbackProcessor):
             FeedbackModel: 处理后的反馈
         """
         # 确保反馈内容是文本类型
-        if not isinstance(feedback.content, TextContent):
+        if feedback.content.KIND != CONTENT_KIND_TEXT:
             return feedback
         
         # 获取原始文本
@@ -89,17 +212,37 @@ class TextNormalizationProcessor(FeedbackProcessor):
         feedback.content.text = normalized_text
         
         # 添加处理记录到元数据
-        if not hasattr(feedback.metadata, 'processing_history'):
-            feedback.metadata.processing_history = []
-        
-        feedback.metadata.processing_history.append({
-            'processor': self.__class__.__name__,
-            'timestamp': datetime.now().isoformat(),
-            'operation': 'text_normalization'
-        })
+        feedback.metadata.add_processing_record(self._processor_name, time.time_ns(), self.OPERATION)
         
         return feedback
     
+    def process_batch(self, feedbacks: List[FeedbackModel]) -> List[FeedbackModel]:
+        """
+        批量处理文本反馈，进行标准化
+        
+        Args:
+            feedbacks: 原始反馈列表
+            
+        Returns:
+            List[FeedbackModel]: 处理后的反馈列表
+        """
+        # 只处理文本类型的反馈
+        text_feedbacks = [f for f in feedbacks if f.content.KIND == CONTENT_KIND_TEXT]
+        
+        # 一次性标准化整批文本
+        trans = self._trans
+        texts = [f.content.text for f in text_feedbacks]
+        normalized_texts = [_clean(text if text.isascii() else text.translate(trans)) for text in texts]
+        
+        # 写回内容并添加处理记录，整批共用一个时间戳
+        processor_name = self._processor_name
+        timestamp = time.time_ns()
+        for feedback, normalized_text in zip(text_feedbacks, normalized_texts):
+            feedback.content.text = normalized_text
+            feedback.metadata.add_processing_record(processor_name, timestamp, self.OPERATION)
+        
+        return feedbacks
+    
     def _normalize_text(self, text: str) -> str:
         """
         对文本进行标准化处理
@@ -110,17 +253,12 @@ class TextNormalizationProcessor(FeedbackProcessor):
         Returns:
             str: 标准化后的文本
         """
-        # 统一标点符号
-        for cn_punct, en_punct in self.punctuation_map.items():
-            text = text.replace(cn_punct, en_punct)
-        
-        # 去除首尾空格
-        text = text.strip()
+        # 统一标点符号，纯ASCII文本不含需要替换的中文标点，可直接跳过
+        if not text.isascii():
+            text = text.translate(self._trans)
         
-        # 将多个连续空格替换为单个空格
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text
+        # 去除首尾空格并合并连续空格
+        return _clean(text)
 
 class NoiseFilterProcessor(FeedbackProcessor):
     """
@@ -129,6 +267,10 @@ class NoiseFilterProcessor(FeedbackProcessor):
     对反馈内容进行噪声过滤，去除无关信息和干扰内容。
     """
     
+    __slots__ = ('noise_patterns', 'min_content_length', 'noise_regex', '_noise_db')
+    
+    OPERATION = 'noise_filtering'
+    
     def __init__(self, noise_patterns: List[str] = None, min_content_length: int = 5):
         """
         初始化噪声过滤处理器
@@ -144,7 +286,29 @@ class NoiseFilterProcessor(FeedbackProcessor):
             r'(测试消息|test message)'
         ]
         self.min_content_length = min_content_length
-        self.noise_regex = re.compile('|'.join(self.noise_patterns), re.IGNORECASE)
+        self.noise_regex = _compile_noise_regex(tuple(self.noise_patterns))
+        self._noise_db = _compile_noise_db(tuple(self.noise_patterns))
+    
+    def _matches_noise(self, text: str) -> bool:
+        """
+        检查文本是否匹配任一噪声模式
+        
+        Args:
+            text: 文本内容
+            
+        Returns:
+            bool: 是否匹配噪声模式
+        """
+        if self._noise_db is None:
+            return self.noise_regex.search(text) is not None
+        
+        matched = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched.append(pattern_id)
+        
+        self._noise_db.scan(text.encode('utf-8'), match_event_handler=on_match)
+        return bool(matched)
     
     def process(self, feedback: FeedbackModel) -> FeedbackModel:
         """
@@ -157,30 +321,30 @@ class NoiseFilterProcessor(FeedbackProcessor):
             FeedbackModel: 处理后的反馈
         """
         # 文本内容噪声过滤
-        if isinstance(feedback.content, TextContent):
-            # 获取原始文本
+        if feedback.content.KIND == CONTENT_KIND_TEXT:
+            # 获取原始文本，去除首尾空格的结果在长度检查和写回时共用
             text = feedback.content.text
+            stripped_text = text.strip()
             
             # 内容长度检查
-            if len(text.strip()) < self.min_content_length:
+            if len(stripped_text) < self.min_content_length:
                 # 设置噪声标记
                 feedback.metadata.is_noise = True
                 feedback.metadata.noise_reason = 'content_too_short'
                 return feedback
             
             # 噪声模式匹配
-            if self.noise_regex.search(text):
+            if self._matches_noise(text):
                 # 设置噪声标记
                 feedback.metadata.is_noise = True
                 feedback.metadata.noise_reason = 'matched_noise_pattern'
                 return feedback
             
-            # 过滤噪声内容
-            filtered_text = self.noise_regex.sub('', text)
-            feedback.content.text = filtered_text.strip()
+            # 未匹配到噪声模式，只需去除首尾空格
+            feedback.content.text = stripped_text
         
         # 结构化内容噪声过滤
-        elif isinstance(feedback.content, StructuredContent):
+        elif feedback.content.KIND == CONTENT_KIND_STRUCTURED:
             # 简单实现：检查是否为空数据
             if not feedback.content.data:
                 feedback.metadata.is_noise = True
@@ -188,14 +352,7 @@ class NoiseFilterProcessor(FeedbackProcessor):
                 return feedback
         
         # 添加处理记录到元数据
-        if not hasattr(feedback.metadata, 'processing_history'):
-            feedback.metadata.processing_history = []
-        
-        feedback.metadata.processing_history.append({
-            'processor': self.__class__.__name__,
-            'timestamp': datetime.now().isoformat(),
-            'operation': 'noise_filtering'
-        })
+        feedback.metadata.add_processing_record(self._processor_name, time.time_ns(), self.OPERATION)
         
         return feedback
 
@@ -206,6 +363,14 @@ class SentimentAnalysisProcessor(FeedbackProcessor):
     对反馈内容进行情感分析，识别反馈的情感倾向。
     """
     
+    __slots__ = ('positive_words', 'negative_words', '_word_signs', '_automaton',
+                 '_words_by_first_char', '_score_cache')
+    
+    OPERATION = 'sentiment_analysis'
+    
+    # 情感得分缓存的最大文本条数
+    SCORE_CACHE_SIZE = 100_000
+    
     def __init__(self):
         """
         初始化情感分析处理器
@@ -221,6 +386,57 @@ class SentimentAnalysisProcessor(FeedbackProcessor):
             '差', '糟糕', '不满', '不喜欢', '批评', '错误', '不准确',
             '无用', '无效', '没帮助', '模糊', '难懂', '不合理', '不恰当'
         ]
+        
+        # 情感词到情感方向（+1 积极，-1 消极）的映射，是情感词典的唯一数据来源
+        self._word_signs = {word: 1 for word in self.positive_words}
+        self._word_signs.update((word, -1) for word in self.negative_words)
+        
+        self._build_lexicon_index()
+    
+    def _build_lexicon_index(self) -> None:
+        """
+        根据情感词典构建匹配所需的索引
+        """
+        # 由全部情感词构建的多模式匹配自动机，一次扫描即可找出文本中出现的所有情感词
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word in self._word_signs:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+        
+        # 按首字符索引情感词，未安装自动机时只需检查首字符出现在文本中的词
+        self._words_by_first_char: Dict[str, List[str]] = {}
+        for word in self._word_signs:
+            self._words_by_first_char.setdefault(word[0], []).append(word)
+        
+        # 文本到情感得分的有界缓存，词典变化时随索引一起重建
+        self._score_cache = functools.lru_cache(maxsize=self.SCORE_CACHE_SIZE)(self._score_text)
+    
+    def add_sentiment_words(self, words: List[str], positive: bool = True) -> None:
+        """
+        向情感词典中添加情感词
+        
+        已存在的词会更新为新的情感方向。
+        
+        Args:
+            words: 情感词列表
+            positive: 是否为积极情感词，False表示消极情感词
+        """
+        sign = 1 if positive else -1
+        for word in words:
+            if not word or self._word_signs.get(word) == sign:
+                continue
+            
+            # 情感方向改变时从原列表中移除
+            previous_words = self.negative_words if positive else self.positive_words
+            if word in previous_words:
+                previous_words.remove(word)
+            
+            self._word_signs[word] = sign
+            (self.positive_words if positive else self.negative_words).append(word)
+        
+        self._build_lexicon_index()
     
     def process(self, feedback: FeedbackModel) -> FeedbackModel:
         """
@@ -233,7 +449,7 @@ class SentimentAnalysisProcessor(FeedbackProcessor):
             FeedbackModel: 处理后的反馈
         """
         # 确保反馈内容是文本类型
-        if not isinstance(feedback.content, TextContent):
+        if feedback.content.KIND != CONTENT_KIND_TEXT:
             return feedback
         
         # 获取文本内容
@@ -244,30 +460,72 @@ class SentimentAnalysisProcessor(FeedbackProcessor):
         
         # 添加情感分析结果到元数据
         feedback.metadata.sentiment_score = sentiment_score
-        
-        # 根据得分确定情感标签
-        if sentiment_score > 0.2:
-            feedback.metadata.sentiment = 'positive'
-        elif sentiment_score < -0.2:
-            feedback.metadata.sentiment = 'negative'
-        else:
-            feedback.metadata.sentiment = 'neutral'
+        feedback.metadata.sentiment = self._sentiment_label(sentiment_score)
         
         # 添加处理记录到元数据
-        if not hasattr(feedback.metadata, 'processing_history'):
-            feedback.metadata.processing_history = []
-        
-        feedback.metadata.processing_history.append({
-            'processor': self.__class__.__name__,
-            'timestamp': datetime.now().isoformat(),
-            'operation': 'sentiment_analysis'
-        })
+        feedback.metadata.add_processing_record(self._processor_name, time.time_ns(), self.OPERATION)
         
         return feedback
     
+    def process_batch(self, feedbacks: List[FeedbackModel]) -> List[FeedbackModel]:
+        """
+        批量处理反馈，进行情感分析
+        
+        Args:
+            feedbacks: 原始反馈列表
+            
+        Returns:
+            List[FeedbackModel]: 处理后的反馈列表
+        """
+        # 只处理文本类型的反馈
+        text_feedbacks = [f for f in feedbacks if f.content.KIND == CONTENT_KIND_TEXT]
+        
+        # 一次性计算整批文本的情感得分
+        calculate = self._calculate_sentiment_score
+        scores = [calculate(f.content.text) for f in text_feedbacks]
+        
+        # 写回分析结果并添加处理记录，整批共用一个时间戳
+        processor_name = self._processor_name
+        timestamp = time.time_ns()
+        for feedback, sentiment_score in zip(text_feedbacks, scores):
+            feedback.metadata.sentiment_score = sentiment_score
+            feedback.metadata.sentiment = self._sentiment_label(sentiment_score)
+            feedback.metadata.add_processing_record(processor_name, timestamp, self.OPERATION)
+        
+        return feedbacks
+    
+    @staticmethod
+    def _sentiment_label(sentiment_score: float) -> str:
+        """
+        根据情感得分确定情感标签
+        
+        Args:
+            sentiment_score: 情感得分
+            
+        Returns:
+            str: 情感标签（positive、negative或neutral）
+        """
+        if sentiment_score > 0.2:
+            return 'positive'
+        elif sentiment_score < -0.2:
+            return 'negative'
+        return 'neutral'
+    
     def _calculate_sentiment_score(self, text: str) -> float:
         """
-        计算文本的情感得分
+        计算文本的情感得分，重复出现的文本直接使用缓存结果
+        
+        Args:
+            text: 文本内容
+            
+        Returns:
+            float: 情感得分，范围[-1, 1]，正值表示积极，负值表示消极
+        """
+        return self._score_cache(text)
+    
+    def _score_text(self, text: str) -> float:
+        """
+        基于情感词典计算文本的情感得分
         
         Args:
             text: 文本内容
@@ -275,12 +533,21 @@ class SentimentAnalysisProcessor(FeedbackProcessor):
         Returns:
             float: 情感得分，范围[-1, 1]，正值表示积极，负值表示消极
         """
-        # 简单实现：基于词汇匹配的情感分析
-        positive_count = sum(1 for word in self.positive_words if word in text)
-        negative_count = sum(1 for word in self.negative_words if word in text)
+        # 简单实现：基于词汇匹配的情感分析，每个情感词出现与否只计一次
+        if self._automaton is not None:
+            # 自动机返回 (结束位置, 情感词)，直接在C层取出情感词
+            matched_words = set(map(itemgetter(1), self._automaton.iter(text)))
+        else:
+            words_by_first_char = self._words_by_first_char
+            matched_words = {
+                word
+                for char in words_by_first_char.keys() & set(text)
+                for word in words_by_first_char[char]
+                if word in text
+            }
         
-        total_count = positive_count + negative_count
+        total_count = len(matched_words)
         if total_count == 0:
             return 0.0
         
-        return (positive_count - negative_count) / total_count
\ No newline at end of file
+        return sum(map(self._word_signs.__getitem__, matched_words)) / total_count
\ No newline at end of file
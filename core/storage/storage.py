@@ -9,14 +9,226 @@ from typing import Dict, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
 import json
 import os
+import atexit
+import weakref
+import hashlib
+import functools
 import sqlite3
-from datetime import datetime
+import threading
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import pickle
+from collections import defaultdict, OrderedDict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库 json 的紧凑格式
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 未安装 msgpack 时SQLite存储继续使用 pickle 序列化
+    msgpack = None
 
 from ...models.feedback_model import FeedbackModel, FeedbackCollection
 from ...models.metadata_model import MetadataModel
 from ...models.content_model import ContentModel
-from ...models.relation_model import RelationModel
+from ...models.relation_model import RelationModel, RelationType
+
+# 反馈文件的写缓冲区大小
+_FILE_BUFFER_SIZE = 1 << 16
+
+def _dumps_json(obj: Any) -> bytes:
+    """
+    将对象序列化为紧凑的UTF-8编码JSON字节串
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        bytes: JSON字节串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _connect_sqlite(db_path: str) -> sqlite3.Connection:
+    """
+    打开可跨线程共享的SQLite连接并设置连接级PRAGMA
+    
+    Args:
+        db_path: 数据库文件路径
+        
+    Returns:
+        sqlite3.Connection: 自动提交模式的数据库连接
+    """
+    # 自动提交模式，写操作显式开启事务；扩大预编译语句缓存，使各种查询形状的语句都能复用
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, cached_statements=256)
+    cursor = conn.cursor()
+    
+    # 同步、临时表、内存映射和页缓存均为连接级设置，每个连接都需设置
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA cache_size=-65536')
+    
+    # WAL模式持久保存在数据库文件中，内存数据库不支持
+    if db_path != ':memory:':
+        cursor.execute('PRAGMA journal_mode=WAL')
+    
+    return conn
+
+@functools.lru_cache(maxsize=64)
+def _enum_str(value: Any) -> str:
+    """
+    获取枚举值（如反馈来源、类型）的字符串表示，取值种类很少，结果可以缓存
+    
+    Args:
+        value: 枚举成员或自定义字符串
+        
+    Returns:
+        str: 字符串表示
+    """
+    return value.value if hasattr(value, 'value') else str(value)
+
+def _utc_iso(value: Union[str, datetime]) -> Tuple[str, bool]:
+    """
+    将时间规范化为可按字典序比较的isoformat()格式字符串，带时区的时间先转换为UTC再去掉时区后缀
+    
+    Args:
+        value: datetime实例或ISO格式字符串
+        
+    Returns:
+        Tuple[str, bool]: (规范化的ISO格式字符串, 原时间是否带时区)
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.isoformat(), False
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat(), True
+
+def _fingerprint(data: Any) -> bytes:
+    """
+    计算数据的16字节指纹，用于快速判断内容是否变化
+    
+    Args:
+        data: 待计算指纹的数据（通常为to_dict的结果）
+        
+    Returns:
+        bytes: 指纹
+    """
+    return hashlib.blake2b(_pack_blob(data, data), digest_size=16).digest()
+
+def _loads_json(data: bytes) -> Any:
+    """
+    解析JSON字节串
+    
+    Args:
+        data: JSON字节串
+        
+    Returns:
+        Any: 解析得到的对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# SQLite二进制字段的格式前缀；旧版本的pickle数据以协议标记b'\x80'开头，不会与之冲突
+_BLOB_FORMAT_MSGPACK = b'\x01'
+
+def _pack_blob(payload: Any, fallback: Any) -> bytes:
+    """
+    将数据编码为带格式前缀的msgpack字节串
+    
+    Args:
+        payload: 待编码的数据
+        fallback: msgpack不可用或无法编码时改用pickle序列化的对象
+        
+    Returns:
+        bytes: 编码后的字节串
+    """
+    if msgpack is not None:
+        try:
+            return _BLOB_FORMAT_MSGPACK + msgpack.packb(payload, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            # 含有msgpack无法表示的值（如datetime、自定义对象）时退回pickle
+            pass
+    return pickle.dumps(fallback)
+
+def _unpack_blob(blob: bytes) -> Tuple[bool, Any]:
+    """
+    解码SQLite二进制字段
+    
+    Args:
+        blob: 二进制字段内容
+        
+    Returns:
+        Tuple[bool, Any]: (是否为msgpack格式, 解码结果)，非msgpack格式时解码结果为pickle还原的对象
+    """
+    if blob[:1] == _BLOB_FORMAT_MSGPACK:
+        return True, msgpack.unpackb(blob[1:], raw=False, strict_map_key=False)
+    return False, pickle.loads(blob)
+
+def _pack_model(model: Any) -> bytes:
+    """
+    编码内容或元数据模型，to_dict之外的实例属性（如处理历史、情感分数）一并保存
+    
+    Args:
+        model: 内容模型或元数据模型实例
+        
+    Returns:
+        bytes: 编码后的字节串
+    """
+    data = model.to_dict()
+    extra = {key: value for key, value in vars(model).items() if key not in data}
+    return _pack_blob({'data': data, 'extra': extra}, model)
+
+def _unpack_model(blob: bytes, model_cls: type) -> Any:
+    """
+    解码内容或元数据模型
+    
+    Args:
+        blob: 二进制字段内容
+        model_cls: 提供from_dict的模型类
+        
+    Returns:
+        Any: 模型实例
+    """
+    is_msgpack, payload = _unpack_blob(blob)
+    if not is_msgpack:
+        return payload
+    
+    model = model_cls.from_dict(payload['data'])
+    model.__dict__.update(payload['extra'])
+    return model
+
+def _pack_value(value: Any) -> bytes:
+    """
+    编码普通数据（如关系元数据字典）
+    
+    Args:
+        value: 待编码的数据
+        
+    Returns:
+        bytes: 编码后的字节串
+    """
+    return _pack_blob(value, value)
+
+def _unpack_value(blob: bytes) -> Any:
+    """
+    解码普通数据
+    
+    Args:
+        blob: 二进制字段内容
+        
+    Returns:
+        Any: 解码结果
+    """
+    return _unpack_blob(blob)[1]
 
 class FeedbackStorage(ABC):
     """
@@ -116,6 +328,231 @@ class FeedbackStorage(ABC):
         """
         pass
 
+class _LRUCache:
+    """
+    线程安全的定长LRU缓存，支持按键失效
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        初始化缓存
+        
+        Args:
+            capacity: 最大条目数
+        """
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        """
+        获取缓存值，命中时将其标记为最近使用
+        
+        Args:
+            key: 键
+            
+        Returns:
+            Any: 缓存值，未命中时返回None
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+        
+        Args:
+            key: 键
+            value: 值
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: str) -> None:
+        """
+        使指定键失效
+        
+        Args:
+            key: 键
+        """
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._data.clear()
+
+class _BackgroundWriter:
+    """
+    后台文件写入线程
+    
+    写入请求进入有界队列，由单个后台线程依次写盘；同一反馈在写入前的多次保存只写入最后一次的内容。
+    写入失败的键会被记录下来，由调用方通过take_failures取出处理。
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        """
+        初始化后台写入线程
+        
+        Args:
+            maxsize: 写入队列的最大长度，队列满时提交方阻塞等待
+        """
+        self._queue = queue.Queue(maxsize=maxsize)
+        # 等待写入的内容：键 -> (文件路径, 数据)
+        self._pending = {}
+        # 已在队列中、尚未被后台线程取出的键
+        self._queued = set()
+        # 写入失败且之后没有再次提交的键 -> 异常
+        self._failed = {}
+        self._lock = threading.Lock()
+        # 写文件与删除文件互斥，避免删除后被正在进行的写入重新创建
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+    
+    def submit(self, key: str, path: str, data: bytes) -> None:
+        """
+        提交写入请求，覆盖同一键尚未写入的内容
+        
+        Args:
+            key: 合并写入的键（反馈ID）
+            path: 文件路径
+            data: 文件内容
+        """
+        with self._lock:
+            self._pending[key] = (path, data)
+            self._failed.pop(key, None)
+            enqueue = key not in self._queued
+            if enqueue:
+                self._queued.add(key)
+        
+        # 在锁外入队，队列已满时不会阻塞后台线程
+        if enqueue:
+            self._queue.put(key)
+    
+    def get_pending(self, key: str) -> Optional[bytes]:
+        """
+        获取尚未写入磁盘的内容
+        
+        Args:
+            key: 反馈ID
+            
+        Returns:
+            Optional[bytes]: 尚未写入的文件内容，如没有则返回None
+        """
+        with self._lock:
+            entry = self._pending.get(key)
+        return None if entry is None else entry[1]
+    
+    def discard(self, key: str, path: str) -> bool:
+        """
+        取消尚未写入的内容并删除文件
+        
+        Args:
+            key: 反馈ID
+            path: 文件路径
+            
+        Returns:
+            bool: 是否存在待写入的内容或文件
+        """
+        with self._lock:
+            had_pending = self._pending.pop(key, None) is not None
+            self._failed.pop(key, None)
+        
+        with self._write_lock:
+            try:
+                os.remove(path)
+                removed = True
+            except FileNotFoundError:
+                removed = False
+        
+        return had_pending or removed
+    
+    def join(self) -> None:
+        """
+        等待所有已提交的写入完成
+        """
+        self._queue.join()
+    
+    def take_failures(self) -> Dict[str, Exception]:
+        """
+        取出并清空写入失败的记录
+        
+        Returns:
+            Dict[str, Exception]: 写入失败的键及对应的异常
+        """
+        with self._lock:
+            failed, self._failed = self._failed, {}
+        return failed
+    
+    def close(self) -> None:
+        """
+        写完已提交的内容后停止后台线程
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+    
+    def _drain(self) -> None:
+        """
+        后台线程主循环
+        """
+        while True:
+            key = self._queue.get()
+            try:
+                if key is None:
+                    return
+                
+                with self._write_lock:
+                    with self._lock:
+                        self._queued.discard(key)
+                        entry = self._pending.get(key)
+                    
+                    # 写入前已被删除
+                    if entry is None:
+                        continue
+                    
+                    path, data = entry
+                    error = None
+                    try:
+                        with open(path, 'wb', buffering=_FILE_BUFFER_SIZE) as f:
+                            f.write(data)
+                            f.flush()
+                            os.fsync(f.fileno())
+                    except Exception as e:
+                        print(f"Error saving feedback: {e}")
+                        error = e
+                    
+                    # 写入期间又有新的保存时保留新内容，等待其自身的写入请求，不记录本次失败
+                    with self._lock:
+                        if self._pending.get(key) is entry:
+                            del self._pending[key]
+                            if error is not None:
+                                self._failed[key] = error
+            finally:
+                self._queue.task_done()
+
+# 存活的JSON文件存储实例，解释器退出时统一写回未保存的索引修改
+_open_json_storages = weakref.WeakSet()
+
+def _flush_json_storages() -> None:
+    """
+    在解释器退出前写回所有JSON文件存储的索引
+    """
+    for storage in list(_open_json_storages):
+        storage.flush()
+
+atexit.register(_flush_json_storages)
+
 class JSONFileStorage(FeedbackStorage):
     """
     JSON文件存储
@@ -123,6 +560,12 @@ class JSONFileStorage(FeedbackStorage):
     将反馈以JSON格式存储在文件系统中。
     """
     
+    # 索引累计修改多少次后写回磁盘
+    INDEX_FLUSH_INTERVAL = 64
+    
+    # 缓存的反馈文件内容条数
+    CACHE_SIZE = 1024
+    
     def __init__(self, storage_dir: str):
         """
         初始化JSON文件存储
@@ -137,14 +580,34 @@ class JSONFileStorage(FeedbackStorage):
         self.index_dir = os.path.join(storage_dir, 'index')
         os.makedirs(self.index_dir, exist_ok=True)
         
+        # 已确认存在的分片目录
+        self._dirs_seen = set()
+        
+        # 批量读取文件的线程池，首次批量读取时创建
+        self._io_pool = None
+        
+        # 反馈文件由后台线程写入
+        self._writer = _BackgroundWriter()
+        
+        # 最近读写的反馈文件内容（字节串），每次读取都重新解析，调用方拿到的是独立的模型实例
+        self._cache = _LRUCache(self.CACHE_SIZE)
+        
+        # 将旧版本平铺在存储目录下的反馈文件迁移到分片目录
+        self._migrate()
+        
         # 加载索引
         self.load_index()
+        _open_json_storages.add(self)
     
     def load_index(self) -> None:
         """
         加载索引
         """
         self.index = {}
+        self.tag_index = defaultdict(set)
+        self._columns = None
+        self._index_dirty = False
+        self._dirty_count = 0
         index_file = os.path.join(self.index_dir, 'main_index.json')
         
         if os.path.exists(index_file):
@@ -154,6 +617,59 @@ class JSONFileStorage(FeedbackStorage):
             except Exception as e:
                 print(f"Error loading index: {e}")
                 self.index = {}
+        
+        # 上次关闭前索引有未写回的修改（如进程崩溃），按分片目录中的文件修正索引
+        if os.path.exists(self._dirty_marker_path()):
+            self._reconcile_index()
+        
+        # 构建标签倒排索引
+        for feedback_id, info in self.index.items():
+            for tag in info['tags']:
+                self.tag_index[tag].add(feedback_id)
+        
+        if self._index_dirty:
+            self.save_index()
+    
+    def _dirty_marker_path(self) -> str:
+        """
+        获取索引未写回标记文件的路径，该文件存在表示磁盘上的索引可能落后于反馈文件
+        
+        Returns:
+            str: 标记文件路径
+        """
+        return os.path.join(self.index_dir, 'main_index.dirty')
+    
+    def _reconcile_index(self) -> None:
+        """
+        扫描分片目录，为索引中缺失的反馈文件补充索引项，并移除文件已不存在的索引项
+        """
+        found = set()
+        for level1 in os.scandir(self.storage_dir):
+            if not level1.is_dir() or len(level1.name) != 2:
+                continue
+            for level2 in os.scandir(level1.path):
+                if not level2.is_dir():
+                    continue
+                for entry in os.scandir(level2.path):
+                    if not entry.is_file() or not entry.name.endswith('.json'):
+                        continue
+                    
+                    feedback_id = entry.name[:-len('.json')]
+                    found.add(feedback_id)
+                    if feedback_id in self.index:
+                        continue
+                    
+                    try:
+                        with open(entry.path, 'rb') as f:
+                            feedback = FeedbackModel.from_dict(_loads_json(f.read()))
+                        self.index[feedback_id] = self._index_entry(feedback)
+                    except Exception as e:
+                        print(f"Error recovering feedback file {entry.name}: {e}")
+        
+        for feedback_id in [feedback_id for feedback_id in self.index if feedback_id not in found]:
+            del self.index[feedback_id]
+        
+        self._index_dirty = True
     
     def save_index(self) -> None:
         """
@@ -162,11 +678,83 @@ class JSONFileStorage(FeedbackStorage):
         index_file = os.path.join(self.index_dir, 'main_index.json')
         
         try:
+            # 索引只供程序读取，使用紧凑格式以减少序列化开销
             with open(index_file, 'w', encoding='utf-8') as f:
-                json.dump(self.index, f, ensure_ascii=False, indent=2)
+                json.dump(self.index, f, ensure_ascii=False, separators=(',', ':'))
+            
+            self._index_dirty = False
+            self._dirty_count = 0
+            
+            # 索引已与反馈文件一致
+            if os.path.exists(self._dirty_marker_path()):
+                os.remove(self._dirty_marker_path())
         except Exception as e:
             print(f"Error saving index: {e}")
     
+    def _mark_index_dirty(self) -> None:
+        """
+        标记索引已修改，累计修改达到阈值时写回磁盘
+        """
+        # 索引从已写回变为有未写回的修改时创建标记文件，下次打开时据此判断是否需要修正索引
+        if not self._index_dirty:
+            open(self._dirty_marker_path(), 'wb').close()
+        self._index_dirty = True
+        self._dirty_count += 1
+        
+        if self._dirty_count >= self.INDEX_FLUSH_INTERVAL:
+            self.save_index()
+    
+    def flush(self) -> bool:
+        """
+        等待后台写入完成，并将未写回的索引修改保存到磁盘
+        
+        后台写入失败的反馈会从索引和缓存中移除。
+        
+        Returns:
+            bool: 自上次调用以来的后台写入是否全部成功
+        """
+        self._writer.join()
+        
+        failed = self._writer.take_failures()
+        for feedback_id in failed:
+            self._cache.pop(feedback_id)
+            if feedback_id in self.index:
+                self._remove_from_tag_index(feedback_id)
+                del self.index[feedback_id]
+                self._columns = None
+                self._index_dirty = True
+        
+        if self._index_dirty:
+            self.save_index()
+        
+        return not failed
+    
+    def close(self) -> None:
+        """
+        写回所有修改，停止后台写入线程并关闭读取线程池
+        """
+        self.flush()
+        self._writer.close()
+        
+        if self._io_pool is not None:
+            self._io_pool.shutdown()
+            self._io_pool = None
+    
+    def __del__(self):
+        """
+        对象销毁时写回未保存的修改并停止后台线程
+        """
+        try:
+            # 存储目录已被移除时无需写回
+            if os.path.isdir(self.index_dir):
+                self.flush()
+            self._writer.close()
+            
+            if self._io_pool is not None:
+                self._io_pool.shutdown(wait=False)
+        except Exception:
+            pass
+    
     def _get_feedback_path(self, feedback_id: str) -> str:
         """
         获取反馈文件路径
@@ -177,7 +765,48 @@ class JSONFileStorage(FeedbackStorage):
         Returns:
             str: 文件路径
         """
-        return os.path.join(self.storage_dir, f"{feedback_id}.json")
+        return os.path.join(self._get_shard_dir(feedback_id), f"{feedback_id}.json")
+    
+    def _get_shard_dir(self, feedback_id: str) -> str:
+        """
+        获取反馈文件所在的分片目录，按ID哈希值的前两个字节分为两级目录，
+        避免单个目录下文件过多
+        
+        Args:
+            feedback_id: 反馈ID
+            
+        Returns:
+            str: 分片目录路径
+        """
+        digest = hashlib.blake2b(feedback_id.encode('utf-8'), digest_size=2).hexdigest()
+        return os.path.join(self.storage_dir, digest[:2], digest[2:4])
+    
+    def _ensure_shard_dir(self, feedback_id: str) -> None:
+        """
+        确保反馈文件所在的分片目录存在
+        
+        Args:
+            feedback_id: 反馈ID
+        """
+        shard_dir = self._get_shard_dir(feedback_id)
+        if shard_dir not in self._dirs_seen:
+            os.makedirs(shard_dir, exist_ok=True)
+            self._dirs_seen.add(shard_dir)
+    
+    def _migrate(self) -> None:
+        """
+        将存储目录下平铺的反馈文件迁移到分片目录
+        """
+        for entry in os.scandir(self.storage_dir):
+            if not entry.is_file() or not entry.name.endswith('.json'):
+                continue
+            
+            feedback_id = entry.name[:-len('.json')]
+            try:
+                self._ensure_shard_dir(feedback_id)
+                os.replace(entry.path, self._get_feedback_path(feedback_id))
+            except Exception as e:
+                print(f"Error migrating feedback file {entry.name}: {e}")
     
     def save(self, feedback: FeedbackModel) -> bool:
         """
@@ -193,14 +822,17 @@ class JSONFileStorage(FeedbackStorage):
             # 将反馈转换为字典
             feedback_dict = feedback.to_dict()
             
-            # 保存到文件
+            # 先完整序列化，再交给后台线程一次性写入文件
+            data = _dumps_json(feedback_dict)
+            self._ensure_shard_dir(feedback.feedback_id)
             file_path = self._get_feedback_path(feedback.feedback_id)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(feedback_dict, f, ensure_ascii=False, indent=2)
             
-            # 更新索引
+            # 先更新索引（必要时创建未写回标记），再提交写入，保证崩溃时已写盘的文件都能被修正回索引
             self._update_index(feedback)
             
+            self._writer.submit(feedback.feedback_id, file_path, data)
+            self._cache.put(feedback.feedback_id, data)
+            
             return True
         except Exception as e:
             print(f"Error saving feedback: {e}")
@@ -213,17 +845,54 @@ class JSONFileStorage(FeedbackStorage):
         Args:
             feedback: 反馈模型实例
         """
+        # 从标签倒排索引中移除旧标签
+        self._remove_from_tag_index(feedback.feedback_id)
+        
         # 基本信息索引
-        self.index[feedback.feedback_id] = {
+        self.index[feedback.feedback_id] = self._index_entry(feedback)
+        self._columns = None
+        
+        for tag in feedback.metadata.tags:
+            self.tag_index[tag].add(feedback.feedback_id)
+        
+        # 延迟保存索引
+        self._mark_index_dirty()
+    
+    def _index_entry(self, feedback: FeedbackModel) -> Dict[str, Any]:
+        """
+        生成反馈的基本信息索引项
+        
+        Args:
+            feedback: 反馈模型实例
+            
+        Returns:
+            Dict[str, Any]: 索引项
+        """
+        return {
             'timestamp': feedback.metadata.timestamp.isoformat(),
-            'source': feedback.metadata.source.value if hasattr(feedback.metadata.source, 'value') else str(feedback.metadata.source),
-            'feedback_type': feedback.metadata.feedback_type.value if hasattr(feedback.metadata.feedback_type, 'value') else str(feedback.metadata.feedback_type),
+            'source': _enum_str(feedback.metadata.source),
+            'feedback_type': _enum_str(feedback.metadata.feedback_type),
             'tags': feedback.metadata.tags,
             'reliability': feedback.get_reliability()
         }
+    
+    def _remove_from_tag_index(self, feedback_id: str) -> None:
+        """
+        从标签倒排索引中移除反馈
+        
+        Args:
+            feedback_id: 反馈ID
+        """
+        info = self.index.get(feedback_id)
+        if info is None:
+            return
         
-        # 保存索引
-        self.save_index()
+        for tag in info['tags']:
+            feedback_ids = self.tag_index.get(tag)
+            if feedback_ids is not None:
+                feedback_ids.discard(feedback_id)
+                if not feedback_ids:
+                    del self.tag_index[tag]
     
     def save_batch(self, feedbacks: List[FeedbackModel]) -> bool:
         """
@@ -239,6 +908,10 @@ class JSONFileStorage(FeedbackStorage):
         for feedback in feedbacks:
             if not self.save(feedback):
                 success = False
+        
+        # 批次结束时统一保存索引，后台写入失败同样视为保存失败
+        if not self.flush():
+            success = False
         return success
     
     def get(self, feedback_id: str) -> Optional[FeedbackModel]:
@@ -251,16 +924,26 @@ class JSONFileStorage(FeedbackStorage):
         Returns:
             Optional[FeedbackModel]: 反馈模型实例，如不存在则返回None
         """
-        file_path = self._get_feedback_path(feedback_id)
-        
-        if not os.path.exists(file_path):
+        # 索引记录了所有已保存的反馈，不在索引中的ID无需访问文件系统
+        if feedback_id not in self.index:
             return None
         
+        file_path = self._get_feedback_path(feedback_id)
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                feedback_dict = json.load(f)
+            # 依次读取缓存、尚未写入磁盘的内容，否则一次性读取整个文件
+            data = self._cache.get(feedback_id)
+            if data is None:
+                data = self._writer.get_pending(feedback_id)
+                if data is None:
+                    with open(file_path, 'rb') as f:
+                        data = f.read()
+                self._cache.put(feedback_id, data)
+            feedback_dict = _loads_json(data)
             
             return FeedbackModel.from_dict(feedback_dict)
+        except FileNotFoundError:
+            return None
         except Exception as e:
             print(f"Error loading feedback: {e}")
             return None
@@ -275,12 +958,15 @@ class JSONFileStorage(FeedbackStorage):
         Returns:
             List[FeedbackModel]: 反馈模型实例列表
         """
-        result = []
-        for feedback_id in feedback_ids:
-            feedback = self.get(feedback_id)
-            if feedback:
-                result.append(feedback)
-        return result
+        if len(feedback_ids) < 2:
+            feedbacks = [self.get(feedback_id) for feedback_id in feedback_ids]
+        else:
+            # 各文件相互独立，读取时释放GIL，用线程池重叠I/O等待
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+            feedbacks = list(self._io_pool.map(self.get, feedback_ids))
+        
+        return [feedback for feedback in feedbacks if feedback]
     
     def delete(self, feedback_id: str) -> bool:
         """
@@ -294,17 +980,18 @@ class JSONFileStorage(FeedbackStorage):
         """
         file_path = self._get_feedback_path(feedback_id)
         
-        if not os.path.exists(file_path):
-            return False
-        
         try:
-            # 删除文件
-            os.remove(file_path)
+            # 取消尚未写入的内容并删除文件
+            self._cache.pop(feedback_id)
+            if not self._writer.discard(feedback_id, file_path):
+                return False
             
             # 更新索引
             if feedback_id in self.index:
+                self._remove_from_tag_index(feedback_id)
                 del self.index[feedback_id]
-                self.save_index()
+                self._columns = None
+                self._mark_index_dirty()
             
             return True
         except Exception as e:
@@ -321,14 +1008,48 @@ class JSONFileStorage(FeedbackStorage):
         Returns:
             bool: 更新是否成功
         """
-        # 检查反馈是否存在
+        # 检查反馈是否存在（包括尚未写入磁盘的反馈）
         file_path = self._get_feedback_path(feedback.feedback_id)
-        if not os.path.exists(file_path):
+        if self._writer.get_pending(feedback.feedback_id) is None and not os.path.exists(file_path):
             return False
         
         # 保存更新后的反馈
         return self.save(feedback)
     
+    def _get_columns(self) -> Dict[str, Any]:
+        """
+        获取索引的列式表示，索引变更后首次查询时重建
+        
+        Returns:
+            Dict[str, Any]: 包含ids列表、position映射以及source、feedback_type、timestamp、aware、reliability数组的字典，
+                            带时区的时间戳在timestamp中已转换为UTC，aware标记其是否带时区
+        """
+        if self._columns is None:
+            infos = list(self.index.values())
+            timestamps = []
+            aware = []
+            for info in infos:
+                timestamp = info['timestamp']
+                # isoformat()生成的无时区时间为19或26个字符（带微秒），无需解析
+                if len(timestamp) in (19, 26):
+                    timestamps.append(timestamp)
+                    aware.append(False)
+                else:
+                    timestamp, is_aware = _utc_iso(timestamp)
+                    timestamps.append(timestamp)
+                    aware.append(is_aware)
+            
+            self._columns = {
+                'ids': list(self.index),
+                'position': {feedback_id: i for i, feedback_id in enumerate(self.index)},
+                'source': np.array([info['source'] for info in infos], dtype=object),
+                'feedback_type': np.array([info['feedback_type'] for info in infos], dtype=object),
+                'timestamp': np.array(timestamps, dtype=str),
+                'aware': np.array(aware, dtype=bool),
+                'reliability': np.array([np.nan if info['reliability'] is None else info['reliability'] for info in infos], dtype=np.float64)
+            }
+        return self._columns
+    
     def query(self, **kwargs) -> List[FeedbackModel]:
         """
         查询反馈
@@ -345,46 +1066,53 @@ class JSONFileStorage(FeedbackStorage):
         Returns:
             List[FeedbackModel]: 符合条件的反馈列表
         """
-        # 根据索引筛选符合条件的反馈ID
-        matched_ids = []
-        
-        for feedback_id, info in self.index.items():
-            match = True
-            
-            # 按来源筛选
-            if 'source' in kwargs and info['source'] != kwargs['source']:
-                match = False
-            
-            # 按类型筛选
-            if 'feedback_type' in kwargs and info['feedback_type'] != kwargs['feedback_type']:
-                match = False
-            
-            # 按标签筛选
-            if 'tags' in kwargs:
-                if not set(kwargs['tags']).issubset(set(info['tags'])):
-                    match = False
-            
-            # 按时间范围筛选
-            if 'start_time' in kwargs:
-                start_time = kwargs['start_time']
-                if isinstance(start_time, str):
-                    start_time = datetime.fromisoformat(start_time)
-                if datetime.fromisoformat(info['timestamp']) < start_time:
-                    match = False
-            
-            if 'end_time' in kwargs:
-                end_time = kwargs['end_time']
-                if isinstance(end_time, str):
-                    end_time = datetime.fromisoformat(end_time)
-                if datetime.fromisoformat(info['timestamp']) > end_time:
-                    match = False
-            
-            # 按可靠性筛选
-            if 'min_reliability' in kwargs and info['reliability'] < kwargs['min_reliability']:
-                match = False
-            
-            if match:
-                matched_ids.append(feedback_id)
+        # 只为实际给出的条件在列式索引上生成向量化比较掩码，最后一次性合并
+        columns = self._get_columns()
+        masks = []
+        
+        # 按标签筛选：先用倒排索引求出包含全部标签的候选集合
+        if kwargs.get('tags'):
+            empty = set()
+            candidates = set.intersection(*(self.tag_index.get(tag, empty) for tag in kwargs['tags']))
+            tag_mask = np.zeros(len(columns['ids']), dtype=bool)
+            position = columns['position']
+            tag_mask[[position[feedback_id] for feedback_id in candidates]] = True
+            masks.append(tag_mask)
+        
+        # 按来源筛选
+        if 'source' in kwargs:
+            masks.append(columns['source'] == kwargs['source'])
+        
+        # 按类型筛选
+        if 'feedback_type' in kwargs:
+            masks.append(columns['feedback_type'] == kwargs['feedback_type'])
+        
+        # 按时间范围筛选：时间戳与边界均规范化为isoformat()格式（带时区的先转换为UTC），
+        # 字段定宽补零，字典序与时间先后一致，直接比较字符串；
+        # 与datetime比较相同，带时区与不带时区的时间之间不可比较，此类反馈不满足该边界
+        if 'start_time' in kwargs:
+            bound, bound_aware = _utc_iso(kwargs['start_time'])
+            masks.append(columns['timestamp'] >= bound)
+            if bound_aware or columns['aware'].any():
+                masks.append(columns['aware'] == bound_aware)
+        
+        if 'end_time' in kwargs:
+            bound, bound_aware = _utc_iso(kwargs['end_time'])
+            masks.append(columns['timestamp'] <= bound)
+            if bound_aware or columns['aware'].any():
+                masks.append(columns['aware'] == bound_aware)
+        
+        # 按可靠性筛选（可靠性缺失记为NaN，不满足任何下限）
+        if 'min_reliability' in kwargs:
+            masks.append(columns['reliability'] >= kwargs['min_reliability'])
+        
+        ids = columns['ids']
+        if masks:
+            mask = np.logical_and.reduce(masks) if len(masks) > 1 else masks[0]
+            matched_ids = [ids[i] for i in np.flatnonzero(mask)]
+        else:
+            # 无筛选条件时直接返回全部反馈
+            matched_ids = list(ids)
         
         # 获取符合条件的反馈
         return self.get_batch(matched_ids)
@@ -396,6 +1124,12 @@ class SQLiteStorage(FeedbackStorage):
     将反馈存储在SQLite数据库中。
     """
     
+    # 单条IN查询的参数个数上限，低于SQLite默认的SQLITE_MAX_VARIABLE_NUMBER
+    _IN_CHUNK_SIZE = 900
+    
+    # 缓存的反馈内容与元数据行数
+    CACHE_SIZE = 1024
+    
     def __init__(self, db_path: str):
         """
         初始化SQLite数据库存储
@@ -404,14 +1138,29 @@ class SQLiteStorage(FeedbackStorage):
             db_path: 数据库文件路径
         """
         self.db_path = db_path
+        # 所有操作复用同一个连接，由锁保证跨线程访问的串行化
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._init_db()
+        
+        # 最近读取的(content, metadata)二进制行，每次读取都重新解码，调用方拿到的是独立的模型实例；
+        # 关系可能因其他反馈的保存而变化，始终从数据库读取
+        self._cache = _LRUCache(self.CACHE_SIZE)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开数据库连接，写操作通过_transaction显式开启事务
+        
+        Returns:
+            sqlite3.Connection: 数据库连接
+        """
+        return _connect_sqlite(self.db_path)
     
     def _init_db(self) -> None:
         """
         初始化数据库
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         # 创建反馈表
         cursor.execute('''
@@ -460,9 +1209,31 @@ class SQLiteStorage(FeedbackStorage):
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_relations_source_id ON relations (source_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_relations_target_id ON relations (target_id)')
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        在持久连接上开启事务，成功时提交，异常时回滚
         
-        conn.commit()
-        conn.close()
+        Returns:
+            sqlite3.Cursor: 事务内使用的游标
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('BEGIN')
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+    
+    def close(self) -> None:
+        """
+        关闭数据库连接
+        """
+        with self._lock:
+            self._conn.close()
     
     def save(self, feedback: FeedbackModel) -> bool:
         """
@@ -475,62 +1246,60 @@ class SQLiteStorage(FeedbackStorage):
             bool: 保存是否成功
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # 序列化内容和元数据
-            content_blob = pickle.dumps(feedback.content)
-            metadata_blob = pickle.dumps(feedback.metadata)
+            content_blob = _pack_model(feedback.content)
+            metadata_blob = _pack_model(feedback.metadata)
             
             # 获取源和类型的字符串表示
-            source = feedback.metadata.source.value if hasattr(feedback.metadata.source, 'value') else str(feedback.metadata.source)
-            feedback_type = feedback.metadata.feedback_type.value if hasattr(feedback.metadata.feedback_type, 'value') else str(feedback.metadata.feedback_type)
+            source = _enum_str(feedback.metadata.source)
+            feedback_type = _enum_str(feedback.metadata.feedback_type)
             
             now = datetime.now().isoformat()
             
-            # 插入反馈
-            cursor.execute('''
-            INSERT OR REPLACE INTO feedbacks 
-            (feedback_id, source, feedback_type, timestamp, reliability, content, metadata, created_at, updated_at) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                feedback.feedback_id,
-                source,
-                feedback_type,
-                feedback.metadata.timestamp.isoformat(),
-                feedback.get_reliability(),
-                content_blob,
-                metadata_blob,
-                now,
-                now
-            ))
-            
-            # 删除旧标签
-            cursor.execute('DELETE FROM tags WHERE feedback_id = ?', (feedback.feedback_id,))
-            
-            # 插入标签
-            for tag in feedback.metadata.tags:
-                cursor.execute('INSERT INTO tags (feedback_id, tag) VALUES (?, ?)', (feedback.feedback_id, tag))
-            
-            # 保存关系
-            for relation in feedback.relations:
-                relation_metadata_blob = pickle.dumps(relation.metadata)
-                
+            with self._transaction() as cursor:
+                # 插入反馈
                 cursor.execute('''
-                INSERT OR REPLACE INTO relations 
-                (relation_id, source_id, target_id, relation_type, strength, metadata) 
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT OR REPLACE INTO feedbacks 
+                (feedback_id, source, feedback_type, timestamp, reliability, content, metadata, created_at, updated_at) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    relation.relation_id,
-                    relation.source_id,
-                    relation.target_id,
-                    relation.relation_type.value,
-                    relation.strength,
-                    relation_metadata_blob
+                    feedback.feedback_id,
+                    source,
+                    feedback_type,
+                    feedback.metadata.timestamp.isoformat(),
+                    feedback.get_reliability(),
+                    content_blob,
+                    metadata_blob,
+                    now,
+                    now
                 ))
-            
-            conn.commit()
-            conn.close()
+                
+                # 使缓存失效
+                self._cache.pop(feedback.feedback_id)
+                
+                # 删除旧标签
+                cursor.execute('DELETE FROM tags WHERE feedback_id = ?', (feedback.feedback_id,))
+                
+                # 插入标签
+                for tag in feedback.metadata.tags:
+                    cursor.execute('INSERT INTO tags (feedback_id, tag) VALUES (?, ?)', (feedback.feedback_id, tag))
+                
+                # 保存关系
+                for relation in feedback.relations:
+                    relation_metadata_blob = _pack_value(relation.metadata)
+                    
+                    cursor.execute('''
+                    INSERT OR REPLACE INTO relations 
+                    (relation_id, source_id, target_id, relation_type, strength, metadata) 
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        relation.relation_id,
+                        relation.source_id,
+                        relation.target_id,
+                        relation.relation_type.value,
+                        relation.strength,
+                        relation_metadata_blob
+                    ))
             
             return True
         except Exception as e:
@@ -548,75 +1317,69 @@ class SQLiteStorage(FeedbackStorage):
             bool: 保存是否成功
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.isolation_level = None  # 开启事务模式
-            cursor = conn.cursor()
+            now = datetime.now().isoformat()
             
-            try:
-                cursor.execute('BEGIN TRANSACTION')
+            # 同一批次中重复的反馈以最后一次出现为准
+            latest = {feedback.feedback_id: feedback for feedback in feedbacks}
+            
+            # 在事务外预先构建所有行（序列化内容、元数据和关系元数据）
+            feedback_rows = []
+            for feedback in latest.values():
+                metadata = feedback.metadata
+                feedback_rows.append((
+                    feedback.feedback_id,
+                    _enum_str(metadata.source),
+                    _enum_str(metadata.feedback_type),
+                    metadata.timestamp.isoformat(),
+                    feedback.get_reliability(),
+                    _pack_model(feedback.content),
+                    _pack_model(metadata),
+                    now,
+                    now
+                ))
+            
+            delete_rows = [(feedback_id,) for feedback_id in latest]
+            tag_rows = [(feedback.feedback_id, tag) for feedback in latest.values() for tag in feedback.metadata.tags]
+            relation_rows = [
+                (
+                    relation.relation_id,
+                    relation.source_id,
+                    relation.target_id,
+                    relation.relation_type.value,
+                    relation.strength,
+                    _pack_value(relation.metadata)
+                )
+                for feedback in feedbacks
+                for relation in feedback.relations
+            ]
+            
+            with self._transaction() as cursor:
+                # 插入反馈
+                cursor.executemany('''
+                INSERT OR REPLACE INTO feedbacks 
+                (feedback_id, source, feedback_type, timestamp, reliability, content, metadata, created_at, updated_at) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', feedback_rows)
                 
-                for feedback in feedbacks:
-                    # 序列化内容和元数据
-                    content_blob = pickle.dumps(feedback.content)
-                    metadata_blob = pickle.dumps(feedback.metadata)
-                    
-                    # 获取源和类型的字符串表示
-                    source = feedback.metadata.source.value if hasattr(feedback.metadata.source, 'value') else str(feedback.metadata.source)
-                    feedback_type = feedback.metadata.feedback_type.value if hasattr(feedback.metadata.feedback_type, 'value') else str(feedback.metadata.feedback_type)
-                    
-                    now = datetime.now().isoformat()
-                    
-                    # 插入反馈
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO feedbacks 
-                    (feedback_id, source, feedback_type, timestamp, reliability, content, metadata, created_at, updated_at) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        feedback.feedback_id,
-                        source,
-                        feedback_type,
-                        feedback.metadata.timestamp.isoformat(),
-                        feedback.get_reliability(),
-                        content_blob,
-                        metadata_blob,
-                        now,
-                        now
-                    ))
-                    
-                    # 删除旧标签
-                    cursor.execute('DELETE FROM tags WHERE feedback_id = ?', (feedback.feedback_id,))
-                    
-                    # 插入标签
-                    for tag in feedback.metadata.tags:
-                        cursor.execute('INSERT INTO tags (feedback_id, tag) VALUES (?, ?)', (feedback.feedback_id, tag))
-                    
-                    # 保存关系
-                    for relation in feedback.relations:
-                        relation_metadata_blob = pickle.dumps(relation.metadata)
-                        
-                        cursor.execute('''
-                        INSERT OR REPLACE INTO relations 
-                        (relation_id, source_id, target_id, relation_type, strength, metadata) 
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (
-                            relation.relation_id,
-                            relation.source_id,
-                            relation.target_id,
-                            relation.relation_type.value,
-                            relation.strength,
-                            relation_metadata_blob
-                        ))
+                # 使缓存失效
+                for feedback_id in latest:
+                    self._cache.pop(feedback_id)
                 
-                cursor.execute('COMMIT')
-                return True
-            except Exception as e:
-                cursor.execute('ROLLBACK')
-                raise e
+                # 删除旧标签并插入新标签
+                cursor.executemany('DELETE FROM tags WHERE feedback_id = ?', delete_rows)
+                cursor.executemany('INSERT INTO tags (feedback_id, tag) VALUES (?, ?)', tag_rows)
+                
+                # 保存关系
+                cursor.executemany('''
+                INSERT OR REPLACE INTO relations 
+                (relation_id, source_id, target_id, relation_type, strength, metadata) 
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', relation_rows)
+            
+            return True
         except Exception as e:
             print(f"Error batch saving feedbacks to SQLite: {e}")
             return False
-        finally:
-            conn.close()
     
     def get(self, feedback_id: str) -> Optional[FeedbackModel]:
         """
@@ -629,42 +1392,30 @@ class SQLiteStorage(FeedbackStorage):
             Optional[FeedbackModel]: 反馈模型实例，如不存在则返回None
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 查询反馈
-            cursor.execute('SELECT content, metadata FROM feedbacks WHERE feedback_id = ?', (feedback_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                conn.close()
-                return None
+            with self._lock:
+                cursor = self._conn.cursor()
+                
+                # 查询反馈，优先使用缓存
+                row = self._cache.get(feedback_id)
+                if row is None:
+                    cursor.execute('SELECT content, metadata FROM feedbacks WHERE feedback_id = ?', (feedback_id,))
+                    row = cursor.fetchone()
+                    
+                    if not row:
+                        return None
+                    
+                    self._cache.put(feedback_id, row)
+                
+                # 查询关系，逐行迭代游标并即时构建关系模型，不一次性物化全部结果
+                cursor.arraysize = 64
+                cursor.execute('SELECT relation_id, source_id, target_id, relation_type, strength, metadata FROM relations WHERE source_id = ? OR target_id = ?', (feedback_id, feedback_id))
+                relations = [self._row_to_relation(relation_row) for relation_row in cursor]
             
             content_blob, metadata_blob = row
             
-            # 反序列化内容和元数据
-            content = pickle.loads(content_blob)
-            metadata = pickle.loads(metadata_blob)
-            
-            # 查询关系
-            cursor.execute('SELECT relation_id, source_id, target_id, relation_type, strength, metadata FROM relations WHERE source_id = ? OR target_id = ?', (feedback_id, feedback_id))
-            relations = []
-            
-            for relation_row in cursor.fetchall():
-                relation_id, source_id, target_id, relation_type, strength, relation_metadata_blob = relation_row
-                relation_metadata = pickle.loads(relation_metadata_blob)
-                
-                from ...models.relation_model import RelationType
-                relation = RelationModel(
-                    source_id=source_id,
-                    target_id=target_id,
-                    relation_type=RelationType(relation_type),
-                    strength=strength,
-                    metadata=relation_metadata
-                )
-                relations.append(relation)
-            
-            conn.close()
+            # 反序列化内容和元数据（在锁外进行）
+            content = _unpack_model(content_blob, ContentModel)
+            metadata = _unpack_model(metadata_blob, MetadataModel)
             
             # 创建反馈模型
             feedback = FeedbackModel(metadata, content, relations)
@@ -683,12 +1434,74 @@ class SQLiteStorage(FeedbackStorage):
         Returns:
             List[FeedbackModel]: 反馈模型实例列表
         """
-        result = []
-        for feedback_id in feedback_ids:
-            feedback = self.get(feedback_id)
-            if feedback:
-                result.append(feedback)
-        return result
+        try:
+            unique_ids = list(dict.fromkeys(feedback_ids))
+            feedback_rows = {}
+            relation_rows = defaultdict(list)
+            
+            with self._lock:
+                cursor = self._conn.cursor()
+                
+                # 分块批量查询，避免超过SQLite的参数个数上限
+                for i in range(0, len(unique_ids), self._IN_CHUNK_SIZE):
+                    chunk = unique_ids[i:i + self._IN_CHUNK_SIZE]
+                    placeholders = ','.join('?' * len(chunk))
+                    
+                    # 查询反馈
+                    cursor.execute(f'SELECT feedback_id, content, metadata FROM feedbacks WHERE feedback_id IN ({placeholders})', chunk)
+                    for feedback_id, content_blob, metadata_blob in cursor.fetchall():
+                        feedback_rows[feedback_id] = (content_blob, metadata_blob)
+                    
+                    # 查询关系，并按所属反馈分组
+                    chunk_ids = set(chunk)
+                    cursor.execute(
+                        'SELECT relation_id, source_id, target_id, relation_type, strength, metadata FROM relations '
+                        f'WHERE source_id IN ({placeholders}) OR target_id IN ({placeholders})',
+                        chunk + chunk
+                    )
+                    for relation_row in cursor.fetchall():
+                        source_id, target_id = relation_row[1], relation_row[2]
+                        if source_id in chunk_ids:
+                            relation_rows[source_id].append(relation_row)
+                        if target_id in chunk_ids and target_id != source_id:
+                            relation_rows[target_id].append(relation_row)
+            
+            # 按请求顺序构建反馈模型（在锁外反序列化）
+            result = []
+            for feedback_id in feedback_ids:
+                row = feedback_rows.get(feedback_id)
+                if row is None:
+                    continue
+                
+                content_blob, metadata_blob = row
+                relations = [self._row_to_relation(relation_row) for relation_row in relation_rows.get(feedback_id, ())]
+                result.append(FeedbackModel(_unpack_model(metadata_blob, MetadataModel), _unpack_model(content_blob, ContentModel), relations))
+            
+            return result
+        except Exception as e:
+            print(f"Error batch getting feedbacks from SQLite: {e}")
+            return []
+    
+    @staticmethod
+    def _row_to_relation(relation_row: Tuple) -> RelationModel:
+        """
+        将关系表中的一行转换为关系模型
+        
+        Args:
+            relation_row: (relation_id, source_id, target_id, relation_type, strength, metadata)元组
+            
+        Returns:
+            RelationModel: 关系模型实例
+        """
+        relation_id, source_id, target_id, relation_type, strength, relation_metadata_blob = relation_row
+        
+        return RelationModel(
+            source_id=source_id,
+            target_id=target_id,
+            relation_type=RelationType(relation_type),
+            strength=strength,
+            metadata=_unpack_value(relation_metadata_blob)
+        )
     
     def delete(self, feedback_id: str) -> bool:
         """
@@ -701,14 +1514,14 @@ class SQLiteStorage(FeedbackStorage):
             bool: 删除是否成功
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 删除反馈（关联的标签和关系会通过外键约束自动删除）
-            cursor.execute('DELETE FROM feedbacks WHERE feedback_id = ?', (feedback_id,))
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as cursor:
+                # 外键级联依赖PRAGMA foreign_keys，而开启后INSERT OR REPLACE会级联删除
+                # 其他反馈指向该反馈的关系，且无法保存指向尚未入库反馈的关系，
+                # 因此在同一事务中显式删除关联的标签和关系
+                self._cache.pop(feedback_id)
+                cursor.execute('DELETE FROM tags WHERE feedback_id = ?', (feedback_id,))
+                cursor.execute('DELETE FROM relations WHERE source_id = ? OR target_id = ?', (feedback_id, feedback_id))
+                cursor.execute('DELETE FROM feedbacks WHERE feedback_id = ?', (feedback_id,))
             
             return True
         except Exception as e:
@@ -726,16 +1539,14 @@ class SQLiteStorage(FeedbackStorage):
             bool: 更新是否成功
         """
         # 检查反馈是否存在
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('SELECT 1 FROM feedbacks WHERE feedback_id = ?', (feedback.feedback_id,))
+            exists = cursor.fetchone() is not None
         
-        cursor.execute('SELECT 1 FROM feedbacks WHERE feedback_id = ?', (feedback.feedback_id,))
-        if not cursor.fetchone():
-            conn.close()
+        if not exists:
             return False
         
-        conn.close()
-        
         # 保存更新后的反馈
         return self.save(feedback)
     
@@ -758,18 +1569,11 @@ class SQLiteStorage(FeedbackStorage):
             List[FeedbackModel]: 符合条件的反馈列表
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # 构建查询
-            query = 'SELECT DISTINCT f.feedback_id FROM feedbacks f'
+            query = 'SELECT f.feedback_id FROM feedbacks f'
             params = []
             conditions = []
             
-            # 标签条件需要连接标签表
-            if 'tags' in kwargs and kwargs['tags']:
-                query += ' LEFT JOIN tags t ON f.feedback_id = t.feedback_id'
-            
             # 按来源筛选
             if 'source' in kwargs:
                 conditions.append('f.source = ?')
@@ -782,14 +1586,16 @@ class SQLiteStorage(FeedbackStorage):
             
             # 按标签筛选
             if 'tags' in kwargs and kwargs['tags']:
-                tag_conditions = []
-                for tag in kwargs['tags']:
-                    tag_conditions.append('t.tag = ?')
-                    params.append(tag)
+                tags = list(set(kwargs['tags']))
                 
-                # 要求匹配所有标签
-                tag_query = ' OR '.join(tag_conditions)
-                conditions.append(f'({tag_query})')
+                # 要求匹配所有标签：通过标签索引取出命中全部标签的反馈；
+                # 标签列表以JSON数组传入json_each，SQL文本与标签个数无关，可复用已编译的语句
+                conditions.append(
+                    'f.feedback_id IN (SELECT feedback_id FROM tags WHERE tag IN (SELECT value FROM json_each(?)) '
+                    'GROUP BY feedback_id HAVING COUNT(DISTINCT tag) = ?)'
+                )
+                params.append(json.dumps(tags, ensure_ascii=False))
+                params.append(len(tags))
             
             # 按时间范围筛选
             if 'start_time' in kwargs:
@@ -828,10 +1634,10 @@ class SQLiteStorage(FeedbackStorage):
                     params.append(int(kwargs['offset']))
             
             # 执行查询
-            cursor.execute(query, params)
-            feedback_ids = [row[0] for row in cursor.fetchall()]
-            
-            conn.close()
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute(query, params)
+                feedback_ids = [row[0] for row in cursor.fetchall()]
             
             # 获取反馈
             return self.get_batch(feedback_ids)
@@ -844,17 +1650,50 @@ class VersionControlStorage(FeedbackStorage):
     版本控制存储
     
     支持反馈的版本控制和历史追踪，适用于需要长期积累和分析反馈演变的场景。
+    版本记录以追加方式写入SQLite的versions表，重启后仍可查询。
     """
     
-    def __init__(self, base_storage: FeedbackStorage):
+    # 当前版本号缓存的最大条目数
+    VERSION_CACHE_SIZE = 4096
+    
+    def __init__(self, base_storage: FeedbackStorage, history_path: Optional[str] = None):
         """
         初始化版本控制存储
         
         Args:
             base_storage: 基础存储实现，用于实际存储反馈数据
+            history_path: 版本历史数据库路径，默认与SQLite基础存储共用数据库文件，
+                          JSON文件基础存储则保存在其索引目录中，其他情况使用内存数据库
         """
         self.base_storage = base_storage
-        self.version_history = {}
+        
+        if history_path is None:
+            if isinstance(base_storage, SQLiteStorage):
+                history_path = base_storage.db_path
+            elif isinstance(base_storage, JSONFileStorage):
+                history_path = os.path.join(base_storage.index_dir, 'versions.db')
+            else:
+                history_path = ':memory:'
+        self.history_path = history_path
+        
+        self._lock = threading.Lock()
+        self._conn = _connect_sqlite(history_path)
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS versions (
+            feedback_id TEXT,
+            version INTEGER,
+            timestamp TEXT,
+            changes BLOB,
+            PRIMARY KEY (feedback_id, version)
+        )
+        ''')
+        
+        # 最近使用的反馈当前版本号（线程安全的LRU），未命中时查询数据库
+        self._current_versions = _LRUCache(self.VERSION_CACHE_SIZE)
+        
+        # 最近保存的反馈各部分指纹（LRU，与版本号缓存容量相同），用于跳过未变化部分的比较；
+        # 未命中时变化检测会从基础存储中的旧版本重新计算
+        self._fingerprints = _LRUCache(self.VERSION_CACHE_SIZE)
     
     def save(self, feedback: FeedbackModel) -> bool:
         """
@@ -866,80 +1705,157 @@ class VersionControlStorage(FeedbackStorage):
         Returns:
             bool: 保存是否成功
         """
-        # 检查是否存在历史版本
-        if feedback.feedback_id in self.version_history:
-            # 获取当前版本号
-            current_version = self.version_history[feedback.feedback_id]['current_version']
-            new_version = current_version + 1
-            
-            # 创建版本记录
-            version_record = {
-                'version': new_version,
-                'timestamp': datetime.now().isoformat(),
-                'changes': self._detect_changes(feedback)
-            }
-            
-            # 更新版本历史
-            self.version_history[feedback.feedback_id]['versions'].append(version_record)
-            self.version_history[feedback.feedback_id]['current_version'] = new_version
-        else:
-            # 创建新的版本历史记录
-            self.version_history[feedback.feedback_id] = {
-                'current_version': 1,
-                'versions': [{
-                    'version': 1,
-                    'timestamp': datetime.now().isoformat(),
-                    'changes': {'type': 'create', 'details': 'Initial version'}
-                }]
-            }
+        feedback_id = feedback.feedback_id
+        fingerprints = self._compute_fingerprints(feedback)
         
-        # 保存到基础存储
-        return self.base_storage.save(feedback)
+        try:
+            # 检查是否存在历史版本（变化检测需要读取基础存储，在锁外进行）
+            if self._get_current_version(feedback_id):
+                changes = self._detect_changes(feedback, fingerprints)
+            else:
+                changes = {'type': 'create', 'details': 'Initial version'}
+            
+            # 追加版本记录，新版本号在同一条语句中由当前最大版本号得出，并发保存同一反馈时不会冲突
+            with self._lock:
+                cursor = self._conn.execute(
+                    'INSERT INTO versions (feedback_id, version, timestamp, changes) '
+                    'SELECT ?, COALESCE(MAX(version), 0) + 1, ?, ? FROM versions WHERE feedback_id = ?',
+                    (feedback_id, datetime.now().isoformat(), _pack_value(changes), feedback_id)
+                )
+                new_version = self._conn.execute(
+                    'SELECT version FROM versions WHERE rowid = ?', (cursor.lastrowid,)
+                ).fetchone()[0]
+                self._current_versions.put(feedback_id, new_version)
+            
+            # 保存到基础存储，失败时撤销本次追加的版本记录
+            if not self.base_storage.save(feedback):
+                with self._lock:
+                    self._conn.execute(
+                        'DELETE FROM versions WHERE feedback_id = ? AND version = ?', (feedback_id, new_version)
+                    )
+                    self._current_versions.pop(feedback_id)
+                self._fingerprints.pop(feedback_id)
+                return False
+            
+            self._fingerprints.put(feedback_id, fingerprints)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving feedback version: {e}")
+            return False
     
-    def _detect_changes(self, new_feedback: FeedbackModel) -> Dict[str, Any]:
+    def _detect_changes(self, new_feedback: FeedbackModel, new_fingerprints: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         检测反馈的变化
         
         Args:
             new_feedback: 新的反馈模型实例
+            new_fingerprints: 新反馈各部分的指纹，未提供时重新计算
             
         Returns:
             Dict[str, Any]: 变化记录
         """
+        if new_fingerprints is None:
+            new_fingerprints = self._compute_fingerprints(new_feedback)
+        old_fingerprints = self._fingerprints.get(new_feedback.feedback_id)
+        
+        # 各部分指纹均未变化时无需读取旧版本
+        if old_fingerprints == new_fingerprints:
+            return {'type': 'update', 'details': {}}
+        
         # 获取旧版本反馈
         old_feedback = self.base_storage.get(new_feedback.feedback_id)
         if not old_feedback:
             return {'type': 'create', 'details': 'Initial version'}
         
+        # 没有缓存的指纹时逐部分比较
+        if old_fingerprints is None:
+            old_fingerprints = self._compute_fingerprints(old_feedback)
+        
         changes = {'type': 'update', 'details': {}}
         
         # 检测元数据变化
-        if old_feedback.metadata.to_dict() != new_feedback.metadata.to_dict():
-            changes['details']['metadata'] = {
-                'old': old_feedback.metadata.to_dict(),
-                'new': new_feedback.metadata.to_dict()
-            }
+        if old_fingerprints['metadata'] != new_fingerprints['metadata']:
+            old_metadata = old_feedback.metadata.to_dict()
+            new_metadata = new_feedback.metadata.to_dict()
+            if old_metadata != new_metadata:
+                changes['details']['metadata'] = {
+                    'old': old_metadata,
+                    'new': new_metadata
+                }
         
         # 检测内容变化
-        if old_feedback.content.to_dict() != new_feedback.content.to_dict():
-            changes['details']['content'] = {
-                'old': old_feedback.content.to_dict(),
-                'new': new_feedback.content.to_dict()
-            }
+        if old_fingerprints['content'] != new_fingerprints['content']:
+            old_content = old_feedback.content.to_dict()
+            new_content = new_feedback.content.to_dict()
+            if old_content != new_content:
+                changes['details']['content'] = {
+                    'old': old_content,
+                    'new': new_content
+                }
+        
+        # 检测关系变化，只对指纹不同的关系生成字典
+        old_relation_fps = old_fingerprints['relations']
+        new_relation_fps = new_fingerprints['relations']
+        
+        if old_relation_fps != new_relation_fps:
+            old_relations = {r.relation_id: r for r in old_feedback.relations}
+            new_relations = {r.relation_id: r for r in new_feedback.relations}
+            
+            added = [r.to_dict() for r_id, r in new_relations.items() if r_id not in old_relations]
+            removed = [r.to_dict() for r_id, r in old_relations.items() if r_id not in new_relations]
+            modified = []
+            for r_id, relation in new_relations.items():
+                if r_id in old_relations and old_relation_fps.get(r_id) != new_relation_fps.get(r_id):
+                    new_relation = relation.to_dict()
+                    if old_relations[r_id].to_dict() != new_relation:
+                        modified.append(new_relation)
+            
+            if added or removed or modified:
+                changes['details']['relations'] = {
+                    'added': added,
+                    'removed': removed,
+                    'modified': modified
+                }
         
-        # 检测关系变化
-        old_relations = {r.relation_id: r.to_dict() for r in old_feedback.relations}
-        new_relations = {r.relation_id: r.to_dict() for r in new_feedback.relations}
+        return changes
+    
+    def _get_current_version(self, feedback_id: str) -> int:
+        """
+        获取反馈的当前版本号
         
-        if old_relations != new_relations:
-            changes['details']['relations'] = {
-                'added': [r for r_id, r in new_relations.items() if r_id not in old_relations],
-                'removed': [r for r_id, r in old_relations.items() if r_id not in new_relations],
-                'modified': [new_relations[r_id] for r_id in set(old_relations).intersection(set(new_relations))
-                             if old_relations[r_id] != new_relations[r_id]]
-            }
+        Args:
+            feedback_id: 反馈ID
+            
+        Returns:
+            int: 当前版本号，不存在版本记录时返回0
+        """
+        version = self._current_versions.get(feedback_id)
+        if version is not None:
+            return version
+        
+        # 查询与回填在同一把锁内进行，避免覆盖并发保存写入的更新版本号
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(version) FROM versions WHERE feedback_id = ?', (feedback_id,)).fetchone()
+            version = row[0] or 0
+            if version:
+                self._current_versions.put(feedback_id, version)
+        return version
+    
+    def _compute_fingerprints(self, feedback: FeedbackModel) -> Dict[str, Any]:
+        """
+        计算反馈各部分的指纹
         
-        return changes
+        Args:
+            feedback: 反馈模型实例
+            
+        Returns:
+            Dict[str, Any]: 元数据、内容的指纹以及按关系ID索引的关系指纹
+        """
+        return {
+            'metadata': _fingerprint(feedback.metadata.to_dict()),
+            'content': _fingerprint(feedback.content.to_dict()),
+            'relations': {r.relation_id: _fingerprint(r.to_dict()) for r in feedback.relations}
+        }
     
     def save_batch(self, feedbacks: List[FeedbackModel]) -> bool:
         """
@@ -969,12 +1885,12 @@ class VersionControlStorage(FeedbackStorage):
             Optional[FeedbackModel]: 反馈模型实例，如不存在则返回None
         """
         # 如果不需要特定版本，直接返回最新版本
-        if version is None or feedback_id not in self.version_history:
+        if version is None:
             return self.base_storage.get(feedback_id)
         
-        # 获取版本历史
-        history = self.version_history[feedback_id]
-        current_version = history['current_version']
+        current_version = self._get_current_version(feedback_id)
+        if not current_version:
+            return self.base_storage.get(feedback_id)
         
         # 检查版本号是否有效
         if version < 1 or version > current_version:
@@ -1012,8 +1928,10 @@ class VersionControlStorage(FeedbackStorage):
             bool: 删除是否成功
         """
         # 删除版本历史
-        if feedback_id in self.version_history:
-            del self.version_history[feedback_id]
+        with self._lock:
+            self._conn.execute('DELETE FROM versions WHERE feedback_id = ?', (feedback_id,))
+            self._current_versions.pop(feedback_id)
+        self._fingerprints.pop(feedback_id)
         
         # 从基础存储中删除
         return self.base_storage.delete(feedback_id)
@@ -1053,4 +1971,26 @@ class VersionControlStorage(FeedbackStorage):
         Returns:
             Optional[Dict[str, Any]]: 版本历史记录，如不存在则返回None
         """
-        return self.version_history.get(feedback_id)
\ No newline at end of file
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT version, timestamp, changes FROM versions WHERE feedback_id = ? ORDER BY version',
+                (feedback_id,)
+            ).fetchall()
+        
+        if not rows:
+            return None
+        
+        return {
+            'current_version': rows[-1][0],
+            'versions': [
+                {'version': version, 'timestamp': timestamp, 'changes': _unpack_value(changes)}
+                for version, timestamp, changes in rows
+            ]
+        }
+    
+    def close(self) -> None:
+        """
+        关闭版本历史数据库连接
+        """
+        with self._lock:
+            self._conn.close()
\ No newline at end of file
@@ -7,7 +7,9 @@
 
 from typing import Dict, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
+import sys
 import json
+from collections import deque, defaultdict
 from datetime import datetime
 import numpy as np
 
@@ -15,6 +17,18 @@ from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel, SourceType, FeedbackType
 from ...models.content_model import ContentModel, TextContent, StructuredContent
 
+def _intern_tool_id(tool_id: Any) -> Any:
+    """
+    驻留字符串工具ID，使各处保存的同一ID共享一个对象，比较时可直接按对象身份判等
+    
+    Args:
+        tool_id: 工具ID
+        
+    Returns:
+        Any: 驻留后的工具ID，非字符串ID原样返回
+    """
+    return sys.intern(tool_id) if type(tool_id) is str else tool_id
+
 class ExecutionOptimizer:
     """
     执行优化模块
@@ -22,13 +36,21 @@ class ExecutionOptimizer:
     基于反馈优化执行策略，实现自适应的工具选择和参数调整机制。
     """
     
+    # 学习的执行模式（n-gram）最大长度
+    MAX_PATTERN_LENGTH = 3
+    
+    # 保留的优化历史记录条数，超出后丢弃最早的记录
+    HISTORY_SIZE = 10000
+    
     def __init__(self):
         """
         初始化执行优化模块
         """
-        self.tool_performance = {}  # 工具性能记录
+        self.tool_performance = defaultdict(list)  # 工具性能记录
+        self.tool_weighted_sums = defaultdict(float)  # 工具性能加权和，随记录增量更新
         self.execution_patterns = {}  # 执行模式记录
-        self.optimization_history = []
+        self.pattern_index = defaultdict(list)  # 模式前缀 -> [(模式序号, 模式)]，用于直接查找后续工具
+        self.optimization_history = deque(maxlen=self.HISTORY_SIZE)
     
     def optimize_tool_selection(self, available_tools: List[Dict[str, Any]], context: Dict[str, Any], feedback: FeedbackModel) -> Dict[str, Any]:
         """
@@ -42,51 +64,62 @@ class ExecutionOptimizer:
         Returns:
             Dict[str, Any]: 工具选择结果
         """
+        # 本次调用产生的记录共用同一时间戳
+        timestamp = datetime.now().isoformat()
+        
         # 更新工具性能记录
         if isinstance(feedback.content, StructuredContent) and isinstance(feedback.content.data, dict):
             tool_feedback = feedback.content.data.get('tool_performance', {})
             for tool_id, performance in tool_feedback.items():
-                if tool_id not in self.tool_performance:
-                    self.tool_performance[tool_id] = []
-                self.tool_performance[tool_id].append({
+                tool_id = _intern_tool_id(tool_id)
+                records = self.tool_performance[tool_id]
+                # 第i条记录的权重为0.5 ** i，加权和随新记录累加
+                self.tool_weighted_sums[tool_id] += performance * 0.5 ** len(records)
+                records.append({
                     'performance': performance,
                     'context': context,
-                    'timestamp': datetime.now().isoformat(),
+                    'context_keys': frozenset(context),
+                    'timestamp': timestamp,
                     'feedback_id': feedback.feedback_id
                 })
         
-        # 计算每个工具的性能得分
+        # 计算每个工具的性能得分，同时记录得分最高的工具（得分相同时取先出现的）
         tool_scores = {}
+        best_tool_id = None
+        best_tool = None
         for tool in available_tools:
             tool_id = tool['id']
             
-            # 如果有历史性能记录，计算加权平均分
-            if tool_id in self.tool_performance and self.tool_performance[tool_id]:
-                performances = [record['performance'] for record in self.tool_performance[tool_id]]
-                # 最近的性能记录权重更高
-                weights = [0.5 ** i for i in range(len(performances))]
-                weighted_sum = sum(p * w for p, w in zip(performances, weights))
-                weight_sum = sum(weights)
-                avg_performance = weighted_sum / weight_sum
+            # 同一工具的得分只计算一次
+            if tool_id in tool_scores:
+                continue
+            
+            # 如果有历史性能记录，计算加权平均分（用get查找，避免为未知工具创建空记录）
+            records = self.tool_performance.get(tool_id)
+            if records:
+                n = len(records)
+                # 加权和已在记录时累加，权重为等比数列，权重和取闭式解 2 * (1 - 0.5 ** n)
+                avg_performance = self.tool_weighted_sums[tool_id] / (2.0 * (1.0 - 0.5 ** n))
                 
                 # 考虑上下文相似度
-                context_similarity = self._calculate_context_similarity(context, self.tool_performance[tool_id])
+                context_similarity = self._calculate_context_similarity(context, records)
                 
                 # 计算最终得分
                 tool_scores[tool_id] = avg_performance * (0.7 + 0.3 * context_similarity)
             else:
                 # 没有历史记录，使用默认得分
                 tool_scores[tool_id] = 0.5
+            
+            if best_tool_id is None or tool_scores[tool_id] > tool_scores[best_tool_id]:
+                best_tool_id = tool_id
+                best_tool = tool
         
         # 选择得分最高的工具
         if tool_scores:
-            best_tool_id = max(tool_scores, key=tool_scores.get)
-            best_tool = next((tool for tool in available_tools if tool['id'] == best_tool_id), None)
-            
             # 记录优化历史
             self.optimization_history.append({
                 'feedback_id': feedback.feedback_id,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'operation': 'tool_selection_optimization',
                 'selected_tool': best_tool_id,
                 'score': tool_scores[best_tool_id]
@@ -120,29 +153,42 @@ class ExecutionOptimizer:
         if not performance_records:
             return 0.0
         
-        # 计算上下文特征的重叠度
-        similarities = []
+        # 当前上下文的键集合与值的字符串形式只计算一次
+        context_keys = frozenset(context)
+        context_values = {k: str(v) for k, v in context.items()}
+        
+        # 计算上下文特征的重叠度，只保留当前最大值
+        max_similarity = 0.0
         for record in performance_records:
             record_context = record.get('context', {})
             
-            # 计算键的重叠度
-            context_keys = set(context.keys())
-            record_keys = set(record_context.keys())
-            key_overlap = len(context_keys.intersection(record_keys)) / len(context_keys.union(record_keys)) if context_keys or record_keys else 0.0
+            # 计算键的重叠度，优先使用记录时缓存的键集合
+            record_keys = record.get('context_keys')
+            if record_keys is None:
+                record_keys = frozenset(record_context)
+            common_keys = context_keys & record_keys
+            
+            # 没有共同的键时键重叠度与值相似度均为0
+            if not common_keys:
+                continue
+            
+            union_size = len(context_keys) + len(record_keys) - len(common_keys)
+            key_overlap = len(common_keys) / union_size
             
             # 计算值的相似度（简化版，只考虑字符串值）
-            value_similarity = 0.0
-            common_keys = context_keys.intersection(record_keys)
-            if common_keys:
-                value_matches = sum(1 for k in common_keys if str(context.get(k)) == str(record_context.get(k)))
-                value_similarity = value_matches / len(common_keys)
+            value_matches = sum(1 for k in common_keys if context_values[k] == str(record_context.get(k)))
+            value_similarity = value_matches / len(common_keys)
             
             # 综合相似度
             similarity = 0.5 * key_overlap + 0.5 * value_similarity
-            similarities.append(similarity)
+            if similarity > max_similarity:
+                max_similarity = similarity
+                # 已达到相似度上限，无需再比较其余记录
+                if max_similarity >= 1.0:
+                    break
         
         # 返回最大相似度
-        return max(similarities) if similarities else 0.0
+        return max_similarity
     
     def optimize_execution_parameters(self, tool_id: str, default_params: Dict[str, Any], feedback: FeedbackModel) -> Dict[str, Any]:
         """
@@ -195,31 +241,40 @@ class ExecutionOptimizer:
             feedback: 反馈模型实例
         """
         # 提取执行序列中的工具ID序列
-        tool_sequence = [step['tool_id'] for step in execution_sequence if 'tool_id' in step]
+        tool_sequence = [_intern_tool_id(step['tool_id']) for step in execution_sequence if 'tool_id' in step]
         
         # 如果序列太短，则不进行学习
         if len(tool_sequence) < 2:
             return
         
+        # 反馈是否积极在整个序列中不变，只判断一次
+        is_success = (isinstance(feedback.content, StructuredContent) and isinstance(feedback.content.data, dict)
+                      and feedback.content.data.get('sentiment', 0) > 0)
+        
         # 提取执行模式（简单实现，使用n-gram模型）
-        for n in range(2, min(4, len(tool_sequence) + 1)):
-            for i in range(len(tool_sequence) - n + 1):
-                pattern = tuple(tool_sequence[i:i+n])
-                if pattern not in self.execution_patterns:
-                    self.execution_patterns[pattern] = {
+        for n in range(2, min(self.MAX_PATTERN_LENGTH + 1, len(tool_sequence) + 1)):
+            # 将序列错位后zip，一次生成全部长度为n的模式元组
+            for pattern in zip(*(tool_sequence[k:] for k in range(n))):
+                stats = self.execution_patterns.get(pattern)
+                if stats is None:
+                    # 新模式按其每个前缀登记到索引中，序号即模式的首次出现顺序
+                    ordinal = len(self.execution_patterns)
+                    for j in range(1, n):
+                        self.pattern_index[pattern[:j]].append((ordinal, pattern))
+                    
+                    stats = {
                         'count': 0,
                         'success_count': 0,
                         'feedback_ids': []
                     }
+                    self.execution_patterns[pattern] = stats
                 
-                self.execution_patterns[pattern]['count'] += 1
-                self.execution_patterns[pattern]['feedback_ids'].append(feedback.feedback_id)
+                stats['count'] += 1
+                stats['feedback_ids'].append(feedback.feedback_id)
                 
                 # 如果反馈是积极的，增加成功计数
-                if isinstance(feedback.content, StructuredContent) and isinstance(feedback.content.data, dict):
-                    sentiment = feedback.content.data.get('sentiment', 0)
-                    if sentiment > 0:
-                        self.execution_patterns[pattern]['success_count'] += 1
+                if is_success:
+                    stats['success_count'] += 1
         
         # 记录学习历史
         self.optimization_history.append({
@@ -245,22 +300,26 @@ class ExecutionOptimizer:
         if not current_sequence:
             return None
         
-        # 查找匹配的模式
+        # 按当前序列的各长度后缀在前缀索引中查找匹配的模式，
+        # 并按模式出现顺序、前缀长度排序，与逐个扫描全部模式的结果一致
+        candidates = []
+        for i in range(1, min(len(current_sequence), self.MAX_PATTERN_LENGTH - 1) + 1):
+            for ordinal, pattern in self.pattern_index.get(tuple(current_sequence[-i:]), ()):
+                candidates.append((ordinal, i, pattern))
+        candidates.sort()
+        
         matching_patterns = {}
-        for pattern, stats in self.execution_patterns.items():
-            for i in range(1, len(pattern)):
-                prefix = pattern[:i]
-                suffix = pattern[i:]
-                if tuple(current_sequence[-i:]) == prefix:
-                    next_tool_id = suffix[0]
-                    success_rate = stats['success_count'] / stats['count'] if stats['count'] > 0 else 0
-                    
-                    if next_tool_id not in matching_patterns or matching_patterns[next_tool_id]['success_rate'] < success_rate:
-                        matching_patterns[next_tool_id] = {
-                            'success_rate': success_rate,
-                            'count': stats['count'],
-                            'pattern': pattern
-                        }
+        for _, i, pattern in candidates:
+            stats = self.execution_patterns[pattern]
+            next_tool_id = pattern[i]
+            success_rate = stats['success_count'] / stats['count'] if stats['count'] > 0 else 0
+            
+            if next_tool_id not in matching_patterns or matching_patterns[next_tool_id]['success_rate'] < success_rate:
+                matching_patterns[next_tool_id] = {
+                    'success_rate': success_rate,
+                    'count': stats['count'],
+                    'pattern': pattern
+                }
         
         # 如果没有匹配的模式，则无法提供建议
         if not matching_patterns:
@@ -7,7 +7,10 @@
 
 from typing import Dict, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
+import re
 import json
+import functools
+from collections import deque
 from datetime import datetime
 import numpy as np
 
@@ -15,6 +18,64 @@ from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel, SourceType, FeedbackType
 from ...models.content_model import ContentModel, TextContent, StructuredContent
 
+# 概念定义（“X是Y。”）与规则（“如果X，那么Y。”）的抽取模式，模块加载时编译一次
+_CONCEPT_RE = re.compile(r"([\w\s]+)是([^，。；！？]+)[，。；！？]")
+_RULE_RE = re.compile(r"如果([^，。；！？]+)，那么([^，。；！？]+)[，。；！？]")
+
+@functools.lru_cache(maxsize=4096)
+def _match_text_knowledge(text: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]]:
+    """
+    匹配文本中的概念定义与规则，结果按文本内容在进程内缓存，重复处理同一文本时无需再次扫描
+    
+    Args:
+        text: 文本内容
+        
+    Returns:
+        Tuple: (概念定义列表, 规则列表)，元素均为去除首尾空白后非空的(前项, 后项)元组
+    """
+    concepts = tuple((concept.strip(), definition.strip()) for concept, definition in _CONCEPT_RE.findall(text))
+    rules = tuple((condition.strip(), result.strip()) for condition, result in _RULE_RE.findall(text))
+    return (
+        tuple((concept, definition) for concept, definition in concepts if concept and definition),
+        tuple((condition, result) for condition, result in rules if condition and result)
+    )
+
+class KnowledgeEntry:
+    """
+    知识库条目
+    
+    包装非字典形式的知识值及其可信度和更新时间，知识库规模较大时比等价的字典占用更少内存。
+    """
+    
+    # 条目属性固定，使用 __slots__ 避免实例字典
+    __slots__ = ('value', 'confidence', 'last_updated')
+    
+    def __init__(self, value: Any, confidence: float, last_updated: str):
+        """
+        初始化知识库条目
+        
+        Args:
+            value: 知识值
+            confidence: 知识可信度，范围[0,1]
+            last_updated: 最后更新时间（ISO格式）
+        """
+        self.value = value
+        self.confidence = confidence
+        self.last_updated = last_updated
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典格式
+        
+        Returns:
+            Dict[str, Any]: 包含value、confidence、last_updated的字典
+        """
+        return {
+            'value': self.value,
+            'confidence': self.confidence,
+            'last_updated': self.last_updated
+        }
+
 class LearningUpdater:
     """
     学习更新模块
@@ -22,6 +83,9 @@ class LearningUpdater:
     基于反馈更新系统的知识和模型，实现持续学习机制。
     """
     
+    # 保留的学习历史记录条数，超出后丢弃最早的记录
+    HISTORY_SIZE = 10000
+    
     def __init__(self, knowledge_base: Dict[str, Any] = None, model_params: Dict[str, Any] = None):
         """
         初始化学习更新模块
@@ -32,7 +96,7 @@ class LearningUpdater:
         """
         self.knowledge_base = knowledge_base if knowledge_base else {}
         self.model_params = model_params if model_params else {}
-        self.learning_history = []
+        self.learning_history = deque(maxlen=self.HISTORY_SIZE)
     
     def extract_knowledge(self, feedback: FeedbackModel) -> Dict[str, Any]:
         """
@@ -79,29 +143,19 @@ class LearningUpdater:
         
         knowledge = {}
         
-        # 提取关键词和概念
-        import re
+        # 匹配结果按文本缓存，这里每次构造新的字典，更新知识库时对其的修改不会影响缓存
+        concepts, rules = _match_text_knowledge(text)
         
         # 提取可能的概念定义
-        concept_pattern = r"([\w\s]+)是([^，。；！？]+)[，。；！？]"
-        concepts = re.findall(concept_pattern, text)
         for concept, definition in concepts:
-            concept = concept.strip()
-            definition = definition.strip()
-            if concept and definition:
-                knowledge[f"concept:{concept}"] = definition
+            knowledge[f"concept:{concept}"] = definition
         
         # 提取可能的规则
-        rule_pattern = r"如果([^，。；！？]+)，那么([^，。；！？]+)[，。；！？]"
-        rules = re.findall(rule_pattern, text)
         for condition, result in rules:
-            condition = condition.strip()
-            result = result.strip()
-            if condition and result:
-                knowledge[f"rule:{condition}->{result}"] = {
-                    'condition': condition,
-                    'result': result
-                }
+            knowledge[f"rule:{condition}->{result}"] = {
+                'condition': condition,
+                'result': result
+            }
         
         return knowledge
     
@@ -150,12 +204,22 @@ class LearningUpdater:
         """
         update_count = 0
         conflict_count = 0
+        knowledge_base = self.knowledge_base
+        
+        # 本次更新的知识与历史记录共用同一时间戳
+        timestamp = datetime.now().isoformat()
         
         for key, value in new_knowledge.items():
             # 检查是否存在冲突
-            if key in self.knowledge_base:
+            if key in knowledge_base:
                 # 如果已有知识的可信度更高，则保留原知识
-                existing_confidence = self.knowledge_base[key].get('confidence', 0.5) if isinstance(self.knowledge_base[key], dict) else 0.5
+                existing = knowledge_base[key]
+                if isinstance(existing, KnowledgeEntry):
+                    existing_confidence = existing.confidence
+                elif isinstance(existing, dict):
+                    existing_confidence = existing.get('confidence', 0.5)
+                else:
+                    existing_confidence = 0.5
                 
                 if confidence <= existing_confidence:
                     conflict_count += 1
@@ -164,20 +228,16 @@ class LearningUpdater:
             # 更新知识
             if isinstance(value, dict):
                 value['confidence'] = confidence
-                value['last_updated'] = datetime.now().isoformat()
-                self.knowledge_base[key] = value
+                value['last_updated'] = timestamp
+                knowledge_base[key] = value
             else:
-                self.knowledge_base[key] = {
-                    'value': value,
-                    'confidence': confidence,
-                    'last_updated': datetime.now().isoformat()
-                }
+                knowledge_base[key] = KnowledgeEntry(value, confidence, timestamp)
             
             update_count += 1
         
         # 记录知识库更新历史
         self.learning_history.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'operation': 'knowledge_base_update',
             'update_count': update_count,
             'conflict_count': conflict_count
@@ -203,11 +263,9 @@ class LearningUpdater:
         
         update_count = 0
         
-        # 更新模型参数
+        # 更新模型参数（参数字典绑定到局部变量，避免循环中重复的属性查找）
+        model_params = self.model_params
         for param_name, update_info in param_updates.items():
-            if param_name not in self.model_params:
-                self.model_params[param_name] = 0.0
-            
             # 获取更新方向和大小
             if isinstance(update_info, dict):
                 direction = update_info.get('direction', 0)
@@ -216,8 +274,8 @@ class LearningUpdater:
                 direction = 1 if update_info > 0 else (-1 if update_info < 0 else 0)
                 magnitude = abs(update_info) if isinstance(update_info, (int, float)) else 1.0
             
-            # 应用更新
-            self.model_params[param_name] += direction * magnitude * learning_rate
+            # 应用更新，尚不存在的参数从0开始
+            model_params[param_name] = model_params.get(param_name, 0.0) + direction * magnitude * learning_rate
             update_count += 1
         
         # 记录模型参数更新历史
@@ -265,4 +323,20 @@ class LearningUpdater:
             result['model_parameters_updated'] = True
             result['updated_parameters'] = list(updated_params.keys())
         
-        return result
\ No newline at end of file
+        return result
+    
+    def apply_feedback_batch(self, feedbacks: List[FeedbackModel]) -> List[Dict[str, Any]]:
+        """
+        批量将反馈应用于模型更新
+        
+        按顺序逐个应用，每条反馈的可靠性决定其知识的可信度，冲突判断也依赖之前反馈的结果，
+        因此不合并各条反馈的知识；批内重复的文本直接复用缓存的匹配结果。
+        
+        Args:
+            feedbacks: 反馈模型实例列表
+            
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的更新结果列表
+        """
+        apply = self.apply_feedback_to_model
+        return [apply(feedback) for feedback in feedbacks]
\ No newline at end of file
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+模式扫描模块
+
+该模块提供多模式文本扫描的公共实现，一次扫描找出全部类型的模式匹配，供规划调整与知识更新等模块共用。
+对外接口为 scan_pattern_spans，其余以下划线开头的函数为内部实现。
+"""
+
+from typing import List, Optional, Any, Tuple
+import re
+import functools
+import operator
+import itertools
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装 pyahocorasick 时使用正则表达式匹配模式
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # 未安装 google-re2 时使用 re 编译模式
+    re2 = None
+
+# 未转义的 Perl 字符类（\d、\w、\s、\b 及其取反形式）；RE2 中这些字符类只匹配 ASCII 字符，re 中匹配 Unicode 字符
+_PERL_CLASS_RE = re.compile(r'(?<!\\)(?:\\\\)*\\[dDwWsSbB]')
+
+@functools.lru_cache(maxsize=32)
+def _compile_pattern_regex(patterns: tuple) -> Any:
+    """
+    将各类模式合并为一个带命名分组的正则表达式，一次扫描即可匹配全部类型，
+    最近使用的模式组合在进程内缓存，无需重复编译
+    
+    优先使用线性时间匹配的 RE2，避免复杂模式在长文本上回溯。模式含有 Perl 字符类时使用 re，
+    RE2 中这些字符类只匹配 ASCII，在中文文本上的匹配结果与 re 不同。
+    
+    Args:
+        patterns: 模式元组，元素为(类型名称, 模式)
+        
+    Returns:
+        Any: 合并后的正则表达式（re2 或 re 的编译结果），分组名 _e{i} 对应第i个模式
+    """
+    pattern = '|'.join(f'(?P<_e{i}>{pattern})' for i, (_, pattern) in enumerate(patterns))
+    if re2 is not None and not _PERL_CLASS_RE.search(pattern):
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            # 模式使用了 RE2 不支持的语法（如反向引用），退回 re
+            pass
+    
+    return re.compile(pattern)
+
+def _expand_literal_pattern(pattern: str) -> Optional[List[str]]:
+    """
+    将只由字面字符和字面候选分组（如"(检查|操作)顺序"）组成的模式展开为全部字面串
+    
+    Args:
+        pattern: 模式
+        
+    Returns:
+        Optional[List[str]]: 按正则表达式尝试顺序排列的字面串列表，模式包含其他正则语法时返回None
+    """
+    parts = []
+    for literal, group in re.findall(r'([^.^$*+?{}\[\]\\|()]+)|\(([^.^$*+?{}\[\]\\()]*)\)|.', pattern):
+        if literal:
+            parts.append((literal,))
+        elif group:
+            parts.append(tuple(group.split('|')))
+        else:
+            return None
+    
+    literals = [''.join(choice) for choice in itertools.product(*parts)]
+    if not literals or not all(literals):
+        return None
+    return literals
+
+@functools.lru_cache(maxsize=32)
+def _build_pattern_automaton(patterns: tuple) -> Any:
+    """
+    将全部为字面候选的模式构建为 Aho-Corasick 自动机，最近使用的模式组合在进程内缓存
+    
+    Args:
+        patterns: 模式元组，元素为(类型名称, 模式)
+        
+    Returns:
+        Any: 自动机，每个字面串的值为(优先级, 模式序号, 长度)；未安装 pyahocorasick
+            或存在无法展开的模式时返回None
+    """
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for index, (_, pattern) in enumerate(patterns):
+        literals = _expand_literal_pattern(pattern)
+        if literals is None:
+            return None
+        for order, literal in enumerate(literals):
+            # 同一字面串以先出现的模式和候选为准，与正则分支的尝试顺序一致
+            if literal not in automaton:
+                automaton.add_word(literal, ((index, order), index, len(literal)))
+    
+    automaton.make_automaton()
+    return automaton
+
+def _iter_automaton_matches(automaton: Any, text: str) -> List[Tuple[int, int, int]]:
+    """
+    用自动机找出与合并正则表达式 finditer 相同的不重叠匹配
+    
+    每个起点取优先级最高的字面串，再从左到右跳过与已选匹配重叠的起点。
+    
+    Args:
+        automaton: _build_pattern_automaton 构建的自动机
+        text: 文本内容
+        
+    Returns:
+        List[Tuple[int, int, int]]: (模式序号, 起始位置, 结束位置)列表
+    """
+    best = {}
+    for end, (rank, index, length) in automaton.iter(text):
+        start = end - length + 1
+        current = best.get(start)
+        if current is None or rank < current[0]:
+            best[start] = (rank, index, end + 1)
+    
+    matches = []
+    position = 0
+    for start in sorted(best):
+        if start >= position:
+            _, index, end = best[start]
+            matches.append((index, start, end))
+            position = end
+    return matches
+
+@functools.lru_cache(maxsize=4096)
+def scan_pattern_spans(patterns: tuple, text: str) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    找出文本中的全部模式匹配，结果按(模式组合, 文本)在进程内缓存，
+    重复处理同一反馈文本时无需再次扫描
+    
+    Args:
+        patterns: 模式元组，元素为(类型名称, 模式)
+        text: 文本内容
+        
+    Returns:
+        Tuple[Tuple[int, int, int], ...]: 按模式定义顺序稳定排序的(模式序号, 起始位置, 结束位置)元组
+    """
+    automaton = _build_pattern_automaton(patterns)
+    if automaton is not None:
+        # 模式均为字面候选时用自动机线性扫描，不经过正则回溯
+        spans = _iter_automaton_matches(automaton, text)
+    else:
+        spans = [(int(match.lastgroup[2:]), match.start(), match.end())
+                 for match in _compile_pattern_regex(patterns).finditer(text)]
+    
+    # 按模式的定义顺序稳定排序，同一模式的匹配保持在文本中的出现顺序
+    spans.sort(key=operator.itemgetter(0))
+    return tuple(spans)
@@ -8,12 +8,17 @@
 from typing import Dict, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
 import json
+from collections import deque, defaultdict
 from datetime import datetime
 import re
+import heapq
+import operator
+import numpy as np
 
 from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel, SourceType, FeedbackType
-from ...models.content_model import ContentModel, TextContent, StructuredContent
+from ...models.content_model import ContentModel, TextContent, StructuredContent, CONTENT_KIND_TEXT, CONTENT_KIND_STRUCTURED
+from .pattern_scanner import scan_pattern_spans
 
 class PlanningAdjuster:
     """
@@ -22,6 +27,9 @@ class PlanningAdjuster:
     基于反馈调整任务规划，实现反馈驱动的规划优化机制。
     """
     
+    # 保留的调整历史记录条数，超出后丢弃最早的记录
+    HISTORY_SIZE = 10000
+    
     def __init__(self):
         """
         初始化规划调整模块
@@ -31,7 +39,7 @@ class PlanningAdjuster:
             "operation_error": r"(检查|操作)顺序(不合理|错误)",
             "resource_error": r"(工具|资源)(选择|分配)(不当|错误)"
         }
-        self.adjustment_history = []
+        self.adjustment_history = deque(maxlen=self.HISTORY_SIZE)
     
     def detect_planning_errors(self, feedback: FeedbackModel) -> List[Dict[str, Any]]:
         """
@@ -44,39 +52,60 @@ class PlanningAdjuster:
             List[Dict[str, Any]]: 检测到的错误列表
         """
         errors = []
+        content = feedback.content
+        kind = content.KIND
         
         # 检查文本反馈中的错误模式
-        if isinstance(feedback.content, TextContent):
-            text = feedback.content.text
+        if kind == CONTENT_KIND_TEXT:
+            text = content.text
+            
+            # 空文本不可能匹配任何错误模式
+            if not text:
+                return errors
             
-            for error_type, pattern in self.error_patterns.items():
-                matches = re.finditer(pattern, text)
-                for match in matches:
-                    errors.append({
-                        'type': error_type,
-                        'position': match.span(),
-                        'text': match.group(),
-                        'confidence': 0.8  # 简单实现，可以根据匹配度等因素计算置信度
-                    })
+            # 一次扫描匹配全部错误类型；匹配位置可以缓存，错误记录每次重新构造，调用方可以自由修改
+            patterns = tuple(self.error_patterns.items())
+            for index, start, end in scan_pattern_spans(patterns, text):
+                errors.append({
+                    'type': patterns[index][0],
+                    'position': (start, end),
+                    'text': text[start:end],
+                    'confidence': 0.8  # 简单实现，可以根据匹配度等因素计算置信度
+                })
         
         # 检查结构化反馈中的错误标记
-        elif isinstance(feedback.content, StructuredContent):
-            data = feedback.content.data
+        elif kind == CONTENT_KIND_STRUCTURED:
+            data = content.data
             if isinstance(data, dict) and 'planning_errors' in data:
                 errors.extend(data['planning_errors'])
         
         return errors
     
-    def adjust_task_priority(self, task_list: List[Dict[str, Any]], feedback: FeedbackModel) -> List[Dict[str, Any]]:
+    def adjust_task_priority(self, task_list: List[Dict[str, Any]], feedback: FeedbackModel, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         根据反馈调整任务优先级
         
         Args:
             task_list: 任务列表
             feedback: 反馈模型实例
+            top_k: 只返回优先级最高的前top_k个任务，默认返回全部任务
+            
+        Returns:
+            List[Dict[str, Any]]: 按优先级从高到低排列的调整后任务列表
+        """
+        return self._adjust_task_priority(task_list, feedback, top_k)[0]
+    
+    def _adjust_task_priority(self, task_list: List[Dict[str, Any]], feedback: FeedbackModel, top_k: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        根据反馈调整任务优先级，并报告是否有任务的优先级或顺序发生变化
+        
+        Args:
+            task_list: 任务列表
+            feedback: 反馈模型实例
+            top_k: 只返回优先级最高的前top_k个任务，默认返回全部任务
             
         Returns:
-            List[Dict[str, Any]]: 调整后的任务列表
+            Tuple[List[Dict[str, Any]], bool]: (按优先级从高到低排列的调整后任务列表, 是否发生变化)
         """
         # 提取反馈中的紧急程度信息
         urgency = 0.0
@@ -86,14 +115,28 @@ class PlanningAdjuster:
         # 根据反馈可靠性和紧急程度计算优先级调整因子
         adjustment_factor = feedback.get_reliability() * urgency
         
-        # 调整任务优先级
-        for task in task_list:
-            # 根据任务类型和反馈内容计算相关性
-            relevance = self._calculate_task_relevance(task, feedback)
-            
-            # 更新优先级
-            original_priority = task.get('priority', 0.5)
-            task['priority'] = min(1.0, original_priority + adjustment_factor * relevance)
+        # 本次调整的记录共用同一时间戳
+        timestamp = datetime.now().isoformat()
+        
+        # 反馈一侧的类型与标签对所有任务相同，只提取一次
+        feedback_type, feedback_tags = self._get_relevance_fields(feedback)
+        
+        # 根据任务类型和反馈内容计算各任务的相关性
+        relevances = [self._calculate_task_relevance(task, feedback_type, feedback_tags) for task in task_list]
+        original_priorities = [task.get('priority', 0.5) for task in task_list]
+        
+        # 整体计算新的优先级
+        new_priorities = np.minimum(
+            1.0,
+            np.asarray(original_priorities, dtype=np.float64) + adjustment_factor * np.asarray(relevances, dtype=np.float64)
+        ).tolist()
+        
+        # 更新优先级
+        changed = False
+        for task, original_priority, new_priority, relevance in zip(task_list, original_priorities, new_priorities, relevances):
+            task['priority'] = new_priority
+            if new_priority != original_priority:
+                changed = True
             
             # 记录调整原因
             if 'adjustments' not in task:
@@ -101,30 +144,59 @@ class PlanningAdjuster:
             task['adjustments'].append({
                 'feedback_id': feedback.feedback_id,
                 'original_priority': original_priority,
-                'new_priority': task['priority'],
+                'new_priority': new_priority,
                 'adjustment_factor': adjustment_factor,
                 'relevance': relevance,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             })
         
         # 记录调整历史
         self.adjustment_history.append({
             'feedback_id': feedback.feedback_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'operation': 'task_priority_adjustment',
             'tasks_adjusted': len(task_list)
         })
         
-        # 根据优先级重新排序任务列表
-        return sorted(task_list, key=lambda x: x.get('priority', 0.0), reverse=True)
+        # 根据优先级重新排序任务列表（上面已为每个任务写入priority）；
+        # 只需前top_k个任务时用堆选取，无需对整个列表排序
+        key = operator.itemgetter('priority')
+        if top_k is not None and top_k < len(task_list):
+            adjusted_tasks = heapq.nlargest(top_k, task_list, key=key)
+        else:
+            adjusted_tasks = sorted(task_list, key=key, reverse=True)
+        
+        # 优先级未变时，重新排序也可能改变任务顺序；逐个比较对象身份即可，无需逐字段比较任务字典
+        if not changed:
+            changed = any(map(operator.is_not, adjusted_tasks, task_list))
+        return adjusted_tasks, changed
     
-    def _calculate_task_relevance(self, task: Dict[str, Any], feedback: FeedbackModel) -> float:
+    @staticmethod
+    def _get_relevance_fields(feedback: FeedbackModel) -> Tuple[Optional[str], frozenset]:
+        """
+        提取计算任务相关性所需的反馈字段
+        
+        Args:
+            feedback: 反馈模型实例
+            
+        Returns:
+            Tuple[Optional[str], frozenset]: (反馈类型值，缺失时为None；反馈标签集合)
+        """
+        metadata = feedback.metadata
+        feedback_type = None
+        if hasattr(metadata, 'feedback_type') and hasattr(metadata.feedback_type, 'value'):
+            feedback_type = metadata.feedback_type.value
+        feedback_tags = frozenset(metadata.tags) if hasattr(metadata, 'tags') else frozenset()
+        return feedback_type, feedback_tags
+    
+    def _calculate_task_relevance(self, task: Dict[str, Any], feedback_type: Optional[str], feedback_tags: frozenset) -> float:
         """
         计算任务与反馈的相关性
         
         Args:
             task: 任务信息
-            feedback: 反馈模型实例
+            feedback_type: 反馈类型值，为None时不比较类型
+            feedback_tags: 反馈标签集合
             
         Returns:
             float: 相关性得分，范围[0,1]
@@ -134,19 +206,18 @@ class PlanningAdjuster:
         relevance = 0.5  # 默认中等相关性
         
         # 检查任务类型与反馈类型的匹配度
-        if hasattr(feedback.metadata, 'feedback_type') and hasattr(feedback.metadata.feedback_type, 'value'):
-            feedback_type = feedback.metadata.feedback_type.value
+        if feedback_type is not None:
             task_type = task.get('type', '')
             
             if feedback_type in task_type or task_type in feedback_type:
                 relevance += 0.3
         
-        # 检查任务标签与反馈标签的重叠度
-        task_tags = set(task.get('tags', []))
-        feedback_tags = set(feedback.metadata.tags) if hasattr(feedback.metadata, 'tags') else set()
-        overlap = len(task_tags.intersection(feedback_tags))
+        # 检查任务标签与反馈标签的重叠度（反馈或任务没有标签时无需构建集合）
+        task_tags = task.get('tags')
         if task_tags and feedback_tags:
-            relevance += 0.2 * (overlap / len(task_tags.union(feedback_tags)))
+            task_tags = set(task_tags)
+            overlap = len(task_tags & feedback_tags)
+            relevance += 0.2 * (overlap / (len(task_tags) + len(feedback_tags) - overlap))
         
         return min(1.0, relevance)
     
@@ -161,6 +232,19 @@ class PlanningAdjuster:
         Returns:
             List[Dict[str, Any]]: 调整后的任务序列
         """
+        return self._adjust_task_sequence(task_sequence, feedback)[0]
+    
+    def _adjust_task_sequence(self, task_sequence: List[Dict[str, Any]], feedback: FeedbackModel) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        根据反馈调整任务执行顺序，并报告是否移动了任务
+        
+        Args:
+            task_sequence: 任务序列
+            feedback: 反馈模型实例
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: (调整后的任务序列, 是否移动了任务)
+        """
         # 提取顺序调整建议
         sequence_suggestions = {}
         if isinstance(feedback.content, StructuredContent) and isinstance(feedback.content.data, dict):
@@ -168,11 +252,15 @@ class PlanningAdjuster:
         
         # 如果没有顺序调整建议，则不进行调整
         if not sequence_suggestions:
-            return task_sequence
+            return task_sequence, False
         
         # 创建任务ID到索引的映射
         task_id_to_index = {task.get('id'): i for i, task in enumerate(task_sequence)}
         
+        # 任务ID唯一时，移动任务后只需更新受影响区间内的索引
+        unique_ids = len(task_id_to_index) == len(task_sequence)
+        changed = False
+        
         # 应用顺序调整建议
         for before_id, after_ids in sequence_suggestions.items():
             if before_id not in task_id_to_index:
@@ -193,9 +281,14 @@ class PlanningAdjuster:
                 # 调整顺序
                 task = task_sequence.pop(after_index)
                 task_sequence.insert(before_index, task)
+                changed = True
                 
-                # 更新索引映射
-                task_id_to_index = {task.get('id'): i for i, task in enumerate(task_sequence)}
+                # 更新索引映射：只有[after_index, before_index]区间内的任务位置发生了变化
+                if unique_ids:
+                    for i in range(after_index, before_index + 1):
+                        task_id_to_index[task_sequence[i].get('id')] = i
+                else:
+                    task_id_to_index = {task.get('id'): i for i, task in enumerate(task_sequence)}
         
         # 记录调整历史
         self.adjustment_history.append({
@@ -205,7 +298,7 @@ class PlanningAdjuster:
             'sequence_suggestions': sequence_suggestions
         })
         
-        return task_sequence
+        return task_sequence, changed
     
     def reallocate_resources(self, resource_allocation: Dict[str, List[str]], feedback: FeedbackModel) -> Dict[str, List[str]]:
         """
@@ -229,31 +322,40 @@ class PlanningAdjuster:
         
         # 计算资源-任务匹配矩阵
         tasks = list(resource_allocation.keys())
-        resources = set()
-        for res_list in resource_allocation.values():
-            resources.update(res_list)
-        resources = list(resources)
-        
-        # 构建效用矩阵
-        utility_matrix = []
-        for task in tasks:
-            row = []
-            for resource in resources:
-                # 获取资源对任务的效用
-                utility = resource_utility.get(f"{resource}_{task}", 0.5)
-                row.append(utility)
-            utility_matrix.append(row)
+        # 按首次出现的顺序去重，资源列的顺序在多次运行间保持一致
+        resources = list(dict.fromkeys(resource for res_list in resource_allocation.values() for resource in res_list))
+        
+        # 构建效用矩阵（行为任务，列为资源），未给出的效用取0.5
+        utility_matrix = np.full((len(tasks), len(resources)), 0.5, dtype=np.float64)
+        
+        # 效用信息通常是稀疏的：逐个解析"{资源}_{任务}"形式的键并填入矩阵，
+        # 而不是为每个任务-资源组合拼接键再查找。ID本身可能含下划线，因此尝试每个分割位置
+        task_rows = defaultdict(list)
+        for i, task in enumerate(tasks):
+            task_rows[str(task)].append(i)
+        resource_columns = defaultdict(list)
+        for j, resource in enumerate(resources):
+            resource_columns[str(resource)].append(j)
+        
+        for key, utility in resource_utility.items():
+            if not isinstance(key, str):
+                continue
+            position = key.find('_')
+            while position != -1:
+                columns = resource_columns.get(key[:position])
+                rows = task_rows.get(key[position + 1:])
+                if columns and rows:
+                    utility_matrix[np.ix_(rows, columns)] = utility
+                position = key.find('_', position + 1)
         
         # 使用匈牙利算法求解最优分配（简化版）
         # 实际应用中可以使用更复杂的算法，如考虑多资源分配等
-        new_allocation = {}
-        for i, task in enumerate(tasks):
-            # 选择效用最高的资源
-            if utility_matrix[i]:
-                best_resource_idx = utility_matrix[i].index(max(utility_matrix[i]))
-                new_allocation[task] = [resources[best_resource_idx]]
-            else:
-                new_allocation[task] = []
+        if resources:
+            # 每个任务选择效用最高的资源，效用相同时取靠前的资源
+            best_resource_indices = utility_matrix.argmax(axis=1).tolist()
+            new_allocation = {task: [resources[idx]] for task, idx in zip(tasks, best_resource_indices)}
+        else:
+            new_allocation = {task: [] for task in tasks}
         
         # 记录调整历史
         self.adjustment_history.append({
@@ -286,15 +388,15 @@ class PlanningAdjuster:
             'resources_reallocated': False
         }
         
-        # 调整任务优先级
-        adjusted_tasks = self.adjust_task_priority(task_list, feedback)
-        if adjusted_tasks != task_list:
+        # 调整任务优先级与顺序：由调整方法直接报告是否有优先级变化或任务移动，
+        # 任务在原地修改，无法通过比较调整前后的列表判断
+        adjusted_tasks, priority_changed = self._adjust_task_priority(task_list, feedback)
+        if priority_changed:
             result['priority_adjusted'] = True
             result['adjusted_tasks'] = adjusted_tasks
         
-        # 调整任务顺序
-        adjusted_sequence = self.adjust_task_sequence(task_sequence, feedback)
-        if adjusted_sequence != task_sequence:
+        adjusted_sequence, sequence_changed = self._adjust_task_sequence(task_sequence, feedback)
+        if sequence_changed:
             result['sequence_adjusted'] = True
             result['adjusted_sequence'] = adjusted_sequence
         
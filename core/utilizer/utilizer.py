@@ -5,14 +5,17 @@
 该模块负责将融合后的反馈信息应用于系统的不同环节，指导系统的行为调整。
 """
 
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
+import re
 import json
+import bisect
 from datetime import datetime
 
 from ...models.feedback_model import FeedbackModel
 from ...models.metadata_model import MetadataModel, SourceType, FeedbackType
 from ...models.content_model import ContentModel, TextContent, StructuredContent
+from .pattern_scanner import scan_pattern_spans
 
 class FeedbackUtilizer(ABC):
     """
@@ -50,6 +53,12 @@ class PlanningAdjuster(FeedbackUtilizer):
             "operation_error": r"(检查|操作)顺序(不合理|错误)",
             "resource_error": r"(工具|资源)(选择|分配)(不当|错误)"
         }
+        # 错误模式在初始化时合并编译为一个带命名分组的正则表达式，一次扫描即可匹配全部类型，
+        # 分组名 _e{i} 对应第i个错误类型
+        self._error_types = list(self.error_patterns)
+        self._error_union_re = re.compile(
+            '|'.join(f'(?P<_e{i}>{pattern})' for i, pattern in enumerate(self.error_patterns.values()))
+        )
     
     def detect_planning_errors(self, feedback: FeedbackModel) -> List[Dict[str, Any]]:
         """
@@ -66,17 +75,16 @@ class PlanningAdjuster(FeedbackUtilizer):
         # 检查文本反馈中的错误模式
         if hasattr(feedback.content, 'text'):
             text = feedback.content.text
-            import re
-            
-            for error_type, pattern in self.error_patterns.items():
-                matches = re.finditer(pattern, text)
-                for match in matches:
-                    errors.append({
-                        'type': error_type,
-                        'position': match.span(),
-                        'text': match.group(),
-                        'confidence': 0.8  # 简单实现，可以根据匹配度等因素计算置信度
-                    })
+            
+            # 一次扫描匹配全部错误类型，再按类型顺序稳定排序，与逐个类型扫描的结果顺序一致
+            matches = sorted(self._error_union_re.finditer(text), key=lambda match: int(match.lastgroup[2:]))
+            for match in matches:
+                errors.append({
+                    'type': self._error_types[int(match.lastgroup[2:])],
+                    'position': match.span(),
+                    'text': match.group(),
+                    'confidence': 0.8  # 简单实现，可以根据匹配度等因素计算置信度
+                })
         
         # 检查结构化反馈中的错误标记
         if hasattr(feedback.content, 'data'):
@@ -546,6 +554,27 @@ class KnowledgeUpdater(FeedbackUtilizer):
         """
         self.knowledge_base = {}  # 知识库
         self.update_history = []  # 更新历史
+        
+        # 简单的医学实体模式
+        self.entity_patterns = {
+            'disease': r'(高血压|糖尿病|冠心病|肺炎|哮喘|癌症|抑郁症)',
+            'symptom': r'(头痛|发热|咳嗽|胸痛|呕吐|腹泻|乏力)',
+            'drug': r'(阿司匹林|布洛芬|青霉素|胰岛素|华法林|他汀类药物)'
+        }
+        
+        # 简单的关系模式
+        self.relation_patterns = {
+            'treats': r'(治疗|缓解|改善)',
+            'causes': r'(导致|引起|诱发)',
+            'diagnoses': r'(诊断|检查|评估)'
+        }
+        
+        # 实体模式均为医学术语的字面候选，扫描时构建为 Aho-Corasick 自动机（未安装 pyahocorasick 时
+        # 使用合并的正则表达式），扫描代价不随词表规模增长；关系模式在初始化时编译一次，
+        # 合并的关系模式用于快速判断文本中是否含有任何关系词
+        self._entity_pattern_items = tuple(self.entity_patterns.items())
+        self._relation_res = {relation_type: re.compile(pattern) for relation_type, pattern in self.relation_patterns.items()}
+        self._combined_relation_re = re.compile('|'.join(self.relation_patterns.values()))
     
     def extract_knowledge(self, feedback: FeedbackModel) -> List[Dict[str, Any]]:
         """
@@ -565,48 +594,40 @@ class KnowledgeUpdater(FeedbackUtilizer):
             
             # 提取医学实体和关系（简化版）
             # 实际应用中可以使用更复杂的信息提取方法，如命名实体识别、关系抽取等
-            import re
-            
-            # 简单的医学实体模式
-            entity_patterns = {
-                'disease': r'(高血压|糖尿病|冠心病|肺炎|哮喘|癌症|抑郁症)',
-                'symptom': r'(头痛|发热|咳嗽|胸痛|呕吐|腹泻|乏力)',
-                'drug': r'(阿司匹林|布洛芬|青霉素|胰岛素|华法林|他汀类药物)'
-            }
             
-            # 简单的关系模式
-            relation_patterns = {
-                'treats': r'(治疗|缓解|改善)',
-                'causes': r'(导致|引起|诱发)',
-                'diagnoses': r'(诊断|检查|评估)'
-            }
-            
-            # 提取实体
+            # 提取实体：一次扫描匹配全部实体类型，结果已按类型顺序排列，与逐个类型扫描的结果顺序一致
             entities = []
-            for entity_type, pattern in entity_patterns.items():
-                matches = re.finditer(pattern, text)
-                for match in matches:
-                    entities.append({
-                        'type': entity_type,
-                        'text': match.group(),
-                        'position': match.span()
-                    })
-            
-            # 简单的关系提取（基于实体共现和关系词）
-            for i, entity1 in enumerate(entities):
-                for j, entity2 in enumerate(entities):
-                    if i == j:
-                        continue
-                    
-                    # 检查两个实体之间的文本
-                    start = min(entity1['position'][1], entity2['position'][1])
-                    end = max(entity1['position'][0], entity2['position'][0])
-                    if start < end:
-                        between_text = text[start:end]
+            entity_pattern_items = self._entity_pattern_items
+            for index, start, end in scan_pattern_spans(entity_pattern_items, text):
+                entities.append({
+                    'type': entity_pattern_items[index][0],
+                    'text': text[start:end],
+                    'position': (start, end)
+                })
+            
+            # 简单的关系提取（基于实体共现和关系词）；文本中没有任何关系词时无需检查实体对
+            if entities and self._combined_relation_re.search(text):
+                # 关系词位置只扫描一次，各实体对之间的关系通过二分查找确定；
+                # 两个方向的实体对共用同一区间，区间内的关系类型只计算一次
+                relation_index = self._index_relations(text)
+                window_relations = {}
+                
+                for i, entity1 in enumerate(entities):
+                    for j, entity2 in enumerate(entities):
+                        if i == j:
+                            continue
                         
-                        # 检查关系模式
-                        for relation_type, pattern in relation_patterns.items():
-                            if re.search(pattern, between_text):
+                        # 检查两个实体之间的文本
+                        start = min(entity1['position'][1], entity2['position'][1])
+                        end = max(entity1['position'][0], entity2['position'][0])
+                        if start < end:
+                            relation_types = window_relations.get((start, end))
+                            if relation_types is None:
+                                relation_types = self._find_window_relations(text, relation_index, start, end)
+                                window_relations[(start, end)] = relation_types
+                            
+                            # 检查关系模式
+                            for relation_type in relation_types:
                                 knowledge_items.append({
                                     'subject': entity1['text'],
                                     'subject_type': entity1['type'],
@@ -627,6 +648,65 @@ class KnowledgeUpdater(FeedbackUtilizer):
         
         return knowledge_items
     
+    def _index_relations(self, text: str) -> List[Tuple[str, Any, List[int], List[int]]]:
+        """
+        扫描文本中各类关系词的位置
+        
+        Args:
+            text: 文本内容
+            
+        Returns:
+            List[Tuple[str, Any, List[int], List[int]]]: 每种关系类型一项，元素为(关系类型, 编译后的模式,
+                全部匹配起点的升序列表, 从每个起点及其之后的起点开始的匹配中最小的结束位置)
+        """
+        relation_index = []
+        for relation_type, relation_re in self._relation_res.items():
+            # 逐个起点查找，重叠的匹配也会被记录
+            starts = []
+            ends = []
+            match = relation_re.search(text)
+            while match:
+                starts.append(match.start())
+                ends.append(match.end())
+                match = relation_re.search(text, match.start() + 1)
+            
+            # 后缀最小值：min_ends[k] 为第k个及之后的起点对应的匹配中最早的结束位置
+            min_ends = ends
+            for k in range(len(min_ends) - 2, -1, -1):
+                if min_ends[k + 1] < min_ends[k]:
+                    min_ends[k] = min_ends[k + 1]
+            
+            relation_index.append((relation_type, relation_re, starts, min_ends))
+        
+        return relation_index
+    
+    def _find_window_relations(self, text: str, relation_index: List[Tuple[str, Any, List[int], List[int]]], start: int, end: int) -> List[str]:
+        """
+        查找文本区间内出现的关系类型，结果与对 text[start:end] 逐个执行关系模式搜索相同
+        
+        Args:
+            text: 文本内容
+            relation_index: _index_relations 返回的关系词位置
+            start: 区间起始位置
+            end: 区间结束位置（不含）
+            
+        Returns:
+            List[str]: 按关系模式顺序排列的关系类型列表
+        """
+        relation_types = []
+        for relation_type, relation_re, starts, min_ends in relation_index:
+            k = bisect.bisect_left(starts, start)
+            
+            # 区间内（含结束位置）没有任何匹配起点，区间文本中不可能出现该关系词
+            if k == len(starts) or starts[k] > end:
+                continue
+            
+            # 存在完全落在区间内的匹配；否则匹配跨越了区间边界，直接在区间文本上确认
+            if min_ends[k] <= end or relation_re.search(text[start:end]):
+                relation_types.append(relation_type)
+        
+        return relation_types
+    
     def validate_knowledge(self, knowledge_items: List[Dict[str, Any]], feedback: FeedbackModel) -> List[Dict[str, Any]]:
         """
         验证提取的知识
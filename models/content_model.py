@@ -17,6 +17,13 @@ class ContentType(Enum):
     STRUCTURED = "structured"  # 结构化反馈，如表单数据
     MULTIMODAL = "multimodal"  # 多模态反馈，如包含文本和图像的反馈
 
+# 内容种类标记，处理器可直接比较整数而不必进行 isinstance 检查
+CONTENT_KIND_GENERIC = 0
+CONTENT_KIND_TEXT = 1
+CONTENT_KIND_STRUCTURED = 2
+CONTENT_KIND_SCALAR = 3
+CONTENT_KIND_MULTIMODAL = 4
+
 class ContentModel:
     """
     反馈内容模型基类
@@ -24,6 +31,8 @@ class ContentModel:
     所有具体内容模型的基类，提供通用接口。
     """
     
+    KIND = CONTENT_KIND_GENERIC
+    
     def __init__(self, content_type: ContentType):
         """
         初始化内容模型
@@ -75,6 +84,8 @@ class ScalarContent(ContentModel):
     表示数值型反馈，如血压、血糖等测量结果。
     """
     
+    KIND = CONTENT_KIND_SCALAR
+    
     def __init__(self, 
                  value: float, 
                  unit: str, 
@@ -144,6 +155,8 @@ class TextContent(ContentModel):
     表示文本型反馈，如医生诊断意见、患者描述等。
     """
     
+    KIND = CONTENT_KIND_TEXT
+    
     def __init__(self, 
                  text: str, 
                  language: str = 'zh-CN', 
@@ -223,6 +236,8 @@ class StructuredContent(ContentModel):
     表示结构化反馈，如表单数据、检查结果等。
     """
     
+    KIND = CONTENT_KIND_STRUCTURED
+    
     def __init__(self, data: Dict[str, Any], schema: Optional[Dict[str, Any]] = None):
         """
         初始化结构化内容模型
@@ -316,6 +331,8 @@ class MultimodalContent(ContentModel):
     表示多模态反馈，如包含文本和图像的反馈。
     """
     
+    KIND = CONTENT_KIND_MULTIMODAL
+    
     def __init__(self, modalities: Dict[str, Any]):
         """
         初始化多模态内容模型
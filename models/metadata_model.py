@@ -40,6 +40,22 @@ class FeedbackType(Enum):
     PROGNOSTIC = "prognostic"              # 预后反馈
     ADMINISTRATIVE = "administrative"      # 管理反馈
 
+def _format_timestamp(timestamp: Union[int, str]) -> str:
+    """
+    将处理记录中的时间戳格式化为ISO格式字符串
+    
+    Args:
+        timestamp: 纳秒级时间戳或ISO格式字符串
+        
+    Returns:
+        str: ISO格式的时间字符串
+    """
+    if isinstance(timestamp, str):
+        return timestamp
+    
+    seconds, nanoseconds = divmod(timestamp, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000).isoformat()
+
 class MetadataModel:
     """
     反馈元数据模型
@@ -93,6 +109,25 @@ class MetadataModel:
         self.reliability = reliability
         self.tags = tags if tags else []
         self.context_id = context_id
+        
+        # 处理历史记录，按列存储处理器、时间戳（纳秒级时间戳，或旧记录中的ISO格式字符串）和操作
+        self._hist_proc: List[str] = []
+        self._hist_ts: List[Union[int, str]] = []
+        self._hist_op: List[str] = []
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        反序列化时补齐旧版本实例缺少的处理历史字段
+        
+        Args:
+            state: 实例属性字典
+        """
+        # 旧版本实例将处理历史以字典列表的形式保存在实例属性中
+        records = state.pop('processing_history', None) or []
+        state.setdefault('_hist_proc', [record['processor'] for record in records])
+        state.setdefault('_hist_ts', [record['timestamp'] for record in records])
+        state.setdefault('_hist_op', [record['operation'] for record in records])
+        self.__dict__.update(state)
     
     def calculate_reliability(self, 
                              source_weight: float = 0.4, 
@@ -164,6 +199,48 @@ class MetadataModel:
         self.reliability = reliability
         return reliability
     
+    @property
+    def processing_history(self) -> Tuple[Dict[str, str], ...]:
+        """
+        处理历史记录
+        
+        处理记录按列分别存储（处理器、时间戳、操作），访问时再组装为只读的记录元组，
+        时间戳在此时才格式化为ISO格式字符串。返回值是快照，对其调用append等修改方法会直接报错；
+        添加记录请使用 add_processing_record，整体替换请为该属性赋值。
+        
+        Returns:
+            Tuple[Dict[str, str], ...]: 处理记录元组，每条记录包含processor、timestamp和operation
+        """
+        return tuple(
+            {'processor': processor, 'timestamp': _format_timestamp(timestamp), 'operation': operation}
+            for processor, timestamp, operation in zip(self._hist_proc, self._hist_ts, self._hist_op)
+        )
+    
+    @processing_history.setter
+    def processing_history(self, records: List[Dict[str, str]]) -> None:
+        """
+        设置处理历史记录
+        
+        Args:
+            records: 处理记录列表，每条记录包含processor、timestamp和operation
+        """
+        self._hist_proc = [record['processor'] for record in records]
+        self._hist_ts = [record['timestamp'] for record in records]
+        self._hist_op = [record['operation'] for record in records]
+    
+    def add_processing_record(self, processor: str, timestamp: Union[int, str], operation: str) -> None:
+        """
+        添加一条处理记录，追加处理历史时使用此方法
+        
+        Args:
+            processor: 处理器名称
+            timestamp: 处理时间，time.time_ns() 返回的纳秒级时间戳或ISO格式字符串
+            operation: 处理操作名称
+        """
+        self._hist_proc.append(processor)
+        self._hist_ts.append(timestamp)
+        self._hist_op.append(operation)
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         将元数据模型转换为字典表示
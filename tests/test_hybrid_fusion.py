@@ -187,6 +187,19 @@ class TestHybridFusionEngine(unittest.TestCase):
         self.assertEqual(self.engine.strategy_history[1]["strategy"], "attention", "第二次应选择注意力机制策略")
         self.assertEqual(self.engine.strategy_history[2]["strategy"], "rl", "第三次应选择强化学习策略")
     
+    def test_history_record_details(self):
+        """
+        测试策略历史记录中反馈类型和来源的展开
+        """
+        self.engine.fuse(self.feedbacks_with_relations)
+        
+        details = self.engine.get_history_record_details(0)
+        expected_types = [f.metadata.feedback_type.value for f in self.feedbacks_with_relations]
+        expected_sources = [f.metadata.source.value for f in self.feedbacks_with_relations]
+        self.assertEqual(details["feedback_types"], expected_types, "应还原反馈类型列表")
+        self.assertEqual(details["feedback_sources"], expected_sources, "应还原反馈来源列表")
+        self.assertEqual(details["strategy"], "graph", "展开后的记录应保留策略名称")
+    
     def test_analyze_strategy_performance(self):
         """
         测试策略性能分析
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+元数据模型测试模块
+
+该模块测试元数据模型的处理历史记录。
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.metadata_model import MetadataModel, SourceType, FeedbackType
+
+
+class TestProcessingHistory(unittest.TestCase):
+    """
+    测试处理历史记录
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.metadata = MetadataModel(
+            source=SourceType.HUMAN_DOCTOR,
+            feedback_type=FeedbackType.DIAGNOSTIC
+        )
+    
+    def test_add_processing_record(self):
+        """
+        测试通过 add_processing_record 添加的记录出现在处理历史中
+        """
+        self.metadata.add_processing_record('NoiseFilterProcessor', time.time_ns(), 'noise_filtering')
+        self.metadata.add_processing_record('FormatConverter', '2024-01-01T12:00:00', 'format_conversion')
+        
+        history = self.metadata.processing_history
+        
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history[0]['processor'], 'NoiseFilterProcessor')
+        self.assertEqual(history[0]['operation'], 'noise_filtering')
+        self.assertIsInstance(history[0]['timestamp'], str)
+        self.assertEqual(history[1]['timestamp'], '2024-01-01T12:00:00')
+    
+    def test_history_is_read_only(self):
+        """
+        测试直接修改处理历史会报错，而不是静默丢失记录
+        """
+        with self.assertRaises(AttributeError):
+            self.metadata.processing_history.append(
+                {'processor': 'P', 'timestamp': '2024-01-01T12:00:00', 'operation': 'op'}
+            )
+        
+        self.assertEqual(len(self.metadata.processing_history), 0)
+    
+    def test_assign_history(self):
+        """
+        测试为处理历史赋值会整体替换记录
+        """
+        records = [{'processor': 'P', 'timestamp': '2024-01-01T12:00:00', 'operation': 'op'}]
+        self.metadata.processing_history = records
+        
+        self.assertEqual(list(self.metadata.processing_history), records)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+规划调整模块测试
+
+该模块测试规划调整模块综合调整结果中的变化标记。
+"""
+
+import unittest
+import sys
+import os
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.utilizer.planning_adjuster import PlanningAdjuster
+from models.feedback_model import FeedbackModel
+from models.metadata_model import MetadataModel, SourceType, FeedbackType
+from models.content_model import StructuredContent
+
+
+class TestPlanningAdjuster(unittest.TestCase):
+    """
+    测试规划调整模块
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.adjuster = PlanningAdjuster()
+    
+    def create_feedback(self, data, reliability=0.9):
+        """
+        创建测试用的结构化反馈
+        """
+        metadata = MetadataModel(
+            source=SourceType.HUMAN_DOCTOR,
+            feedback_type=FeedbackType.DIAGNOSTIC,
+            reliability=reliability
+        )
+        return FeedbackModel(metadata, StructuredContent(data=data))
+    
+    def test_priority_change_without_reorder(self):
+        """
+        测试任务已按优先级排列时，仅优先级变化也标记为已调整
+        """
+        task_list = [
+            {'id': 't1', 'type': 'diagnostic', 'priority': 0.5},
+            {'id': 't2', 'type': 'diagnostic', 'priority': 0.1}
+        ]
+        feedback = self.create_feedback({'urgency': 0.5})
+        
+        result = self.adjuster.adjust_planning(task_list, [], {}, feedback)
+        
+        self.assertTrue(result['priority_adjusted'])
+        self.assertEqual([task['id'] for task in result['adjusted_tasks']], ['t1', 't2'])
+        self.assertGreater(task_list[0]['priority'], 0.5)
+        self.assertGreater(task_list[1]['priority'], 0.1)
+    
+    def test_no_priority_change(self):
+        """
+        测试紧急程度为0且顺序不变时不标记为已调整
+        """
+        task_list = [
+            {'id': 't1', 'priority': 0.5},
+            {'id': 't2', 'priority': 0.1}
+        ]
+        feedback = self.create_feedback({'urgency': 0.0})
+        
+        result = self.adjuster.adjust_planning(task_list, [], {}, feedback)
+        
+        self.assertFalse(result['priority_adjusted'])
+        self.assertNotIn('adjusted_tasks', result)
+    
+    def test_sequence_adjusted(self):
+        """
+        测试按顺序调整建议移动任务后标记为已调整
+        """
+        task_sequence = [{'id': 't1'}, {'id': 't2'}, {'id': 't3'}]
+        feedback = self.create_feedback({'sequence_suggestions': {'t3': ['t1']}})
+        
+        result = self.adjuster.adjust_planning([], task_sequence, {}, feedback)
+        
+        self.assertTrue(result['sequence_adjusted'])
+        self.assertEqual([task['id'] for task in result['adjusted_sequence']], ['t2', 't3', 't1'])
+    
+    def test_sequence_already_ordered(self):
+        """
+        测试顺序已满足建议时不标记为已调整
+        """
+        task_sequence = [{'id': 't1'}, {'id': 't2'}]
+        feedback = self.create_feedback({'sequence_suggestions': {'t1': ['t2']}})
+        
+        result = self.adjuster.adjust_planning([], task_sequence, {}, feedback)
+        
+        self.assertFalse(result['sequence_adjusted'])
+        self.assertNotIn('adjusted_sequence', result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+反馈处理器测试模块
+
+该模块测试噪声过滤处理器的噪声模式匹配。
+"""
+
+import unittest
+import sys
+import os
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.processor.processor import NoiseFilterProcessor
+from models.feedback_model import FeedbackModel
+from models.metadata_model import MetadataModel, SourceType, FeedbackType
+from models.content_model import TextContent
+
+
+class TestNoiseFilterProcessor(unittest.TestCase):
+    """
+    测试噪声过滤处理器
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.processor = NoiseFilterProcessor()
+    
+    def create_text_feedback(self, text):
+        """
+        创建测试用的文本反馈
+        """
+        metadata = MetadataModel(
+            source=SourceType.HUMAN_PATIENT,
+            feedback_type=FeedbackType.TEXTUAL
+        )
+        return FeedbackModel(metadata, TextContent(text=text))
+    
+    def test_time_pattern_halfwidth_digits(self):
+        """
+        测试半角数字的时间格式被识别为噪声
+        """
+        feedback = self.processor.process(self.create_text_feedback("会议在12:30开始，请准时参加"))
+        
+        self.assertTrue(feedback.metadata.is_noise)
+        self.assertEqual(feedback.metadata.noise_reason, 'matched_noise_pattern')
+    
+    def test_time_pattern_fullwidth_digits(self):
+        """
+        测试全角数字的时间格式同样被识别为噪声
+        """
+        feedback = self.processor.process(self.create_text_feedback("会议在１２:３０开始，请准时参加"))
+        
+        self.assertTrue(feedback.metadata.is_noise)
+        self.assertEqual(feedback.metadata.noise_reason, 'matched_noise_pattern')
+    
+    def test_regular_text_not_noise(self):
+        """
+        测试不含噪声模式的文本不被标记为噪声
+        """
+        feedback = self.processor.process(self.create_text_feedback("患者头痛明显缓解，建议继续观察"))
+        
+        self.assertFalse(getattr(feedback.metadata, 'is_noise', False))
+        self.assertEqual(feedback.content.text, "患者头痛明显缓解，建议继续观察")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+反馈存储层测试模块
+
+该模块测试各存储实现的保存、读取与重新打开后的数据一致性。
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import pickle
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+# 添加项目根目录到系统路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.storage.storage import JSONFileStorage, SQLiteStorage, VersionControlStorage
+from models.feedback_model import FeedbackModel
+from models.metadata_model import MetadataModel, SourceType, FeedbackType
+from models.content_model import TextContent
+
+
+def create_feedback(text, tags=None, reliability=0.8, timestamp=None, source=SourceType.HUMAN_DOCTOR):
+    """
+    创建测试用的文本反馈
+    """
+    metadata = MetadataModel(
+        source=source,
+        feedback_type=FeedbackType.TEXTUAL,
+        timestamp=timestamp,
+        reliability=reliability,
+        tags=tags or []
+    )
+    return FeedbackModel(metadata, TextContent(text=text))
+
+
+class TestJSONFileStorage(unittest.TestCase):
+    """
+    测试JSON文件存储
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_dir = os.path.join(self.temp_dir, 'feedbacks')
+    
+    def tearDown(self):
+        """
+        测试后清理
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_save_and_reopen(self):
+        """
+        测试后台写入的反馈在重新打开存储后可以读取
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        feedbacks = [create_feedback(f"反馈{i}", tags=['t']) for i in range(5)]
+        for feedback in feedbacks:
+            self.assertTrue(storage.save(feedback))
+        
+        # 写入磁盘前也能读取
+        self.assertEqual(storage.get(feedbacks[0].feedback_id).content.text, "反馈0")
+        self.assertTrue(storage.flush())
+        storage.close()
+        
+        storage = JSONFileStorage(self.storage_dir)
+        loaded = storage.get_batch([feedback.feedback_id for feedback in feedbacks])
+        
+        self.assertEqual([feedback.content.text for feedback in loaded], [f"反馈{i}" for i in range(5)])
+        self.assertEqual(len(storage.query(tags=['t'])), 5)
+        storage.close()
+    
+    def test_files_are_sharded_and_migrated(self):
+        """
+        测试反馈文件保存在分片目录中，旧版本平铺的文件在打开时迁移到分片目录
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        feedback = create_feedback("患者头痛")
+        storage.save(feedback)
+        storage.close()
+        
+        file_path = storage._get_feedback_path(feedback.feedback_id)
+        self.assertTrue(os.path.exists(file_path))
+        self.assertNotEqual(os.path.dirname(file_path), self.storage_dir)
+        
+        # 模拟旧版本的平铺布局
+        flat_path = os.path.join(self.storage_dir, f"{feedback.feedback_id}.json")
+        os.replace(file_path, flat_path)
+        
+        storage = JSONFileStorage(self.storage_dir)
+        
+        self.assertFalse(os.path.exists(flat_path))
+        self.assertTrue(os.path.exists(file_path))
+        self.assertEqual(storage.get(feedback.feedback_id).content.text, "患者头痛")
+        storage.close()
+    
+    def test_recover_index_after_crash(self):
+        """
+        测试索引未写回时进程崩溃，重新打开后仍能读取已写盘的反馈
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        storage.save(create_feedback("已写回索引"))
+        storage.flush()
+        feedback = create_feedback("未写回索引", tags=['t'])
+        storage.save(feedback)
+        storage._writer.join()
+        
+        # 复制当前磁盘状态模拟崩溃，此时索引文件中还没有第二条反馈
+        crashed_dir = os.path.join(self.temp_dir, 'crashed')
+        shutil.copytree(self.storage_dir, crashed_dir)
+        storage.close()
+        
+        recovered = JSONFileStorage(crashed_dir)
+        
+        self.assertEqual(recovered.get(feedback.feedback_id).content.text, "未写回索引")
+        self.assertEqual(len(recovered.query()), 2)
+        self.assertEqual(len(recovered.query(tags=['t'])), 1)
+        recovered.close()
+    
+    def test_failed_background_write(self):
+        """
+        测试后台写入失败时flush返回False，并从索引和缓存中移除该反馈
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        feedback = create_feedback("患者头痛", tags=['t'])
+        
+        # 在反馈文件路径上创建目录，使写入失败
+        os.makedirs(storage._get_feedback_path(feedback.feedback_id))
+        
+        self.assertTrue(storage.save(feedback))
+        self.assertFalse(storage.flush())
+        self.assertIsNone(storage.get(feedback.feedback_id))
+        self.assertEqual(storage.query(tags=['t']), [])
+        
+        # 失败记录只报告一次
+        self.assertTrue(storage.flush())
+        storage.close()
+    
+    def test_columnar_query(self):
+        """
+        测试按来源、时间范围、可靠性与标签组合查询
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        storage.save(create_feedback("a", tags=['x'], reliability=0.9, timestamp=datetime(2024, 1, 1, 8)))
+        storage.save(create_feedback("b", tags=['x', 'y'], reliability=0.5, timestamp=datetime(2024, 1, 2, 8)))
+        storage.save(create_feedback("c", tags=['y'], reliability=0.7, timestamp=datetime(2024, 1, 3, 8),
+                                     source=SourceType.HUMAN_PATIENT))
+        
+        def texts(**kwargs):
+            return sorted(feedback.content.text for feedback in storage.query(**kwargs))
+        
+        self.assertEqual(texts(), ['a', 'b', 'c'])
+        self.assertEqual(texts(source=SourceType.HUMAN_PATIENT.value), ['c'])
+        self.assertEqual(texts(min_reliability=0.6), ['a', 'c'])
+        self.assertEqual(texts(tags=['x', 'y']), ['b'])
+        self.assertEqual(texts(start_time=datetime(2024, 1, 2), end_time='2024-01-03T08:00:00'), ['b', 'c'])
+        self.assertEqual(texts(tags=['y'], min_reliability=0.6), ['c'])
+        storage.close()
+    
+    
+    def test_query_time_range_with_timezones(self):
+        """
+        测试不同时区的时间戳按UTC比较，带时区与不带时区的时间互不匹配
+        """
+        storage = JSONFileStorage(self.storage_dir)
+        # 北京时间10:00即UTC 02:00，早于UTC 05:00
+        storage.save(create_feedback("east", timestamp=datetime(2024, 1, 1, 10, tzinfo=timezone(timedelta(hours=8)))))
+        storage.save(create_feedback("utc", timestamp=datetime(2024, 1, 1, 5, tzinfo=timezone.utc)))
+        storage.save(create_feedback("naive", timestamp=datetime(2024, 1, 1, 4)))
+        
+        def texts(**kwargs):
+            return sorted(feedback.content.text for feedback in storage.query(**kwargs))
+        
+        self.assertEqual(texts(start_time='2024-01-01T03:00:00+00:00'), ['utc'])
+        self.assertEqual(texts(end_time=datetime(2024, 1, 1, 11, 30, tzinfo=timezone(timedelta(hours=8)))), ['east'])
+        self.assertEqual(texts(start_time=datetime(2024, 1, 1, 3)), ['naive'])
+        storage.close()
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """
+    测试SQLite数据库存储
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'feedback.db')
+    
+    def tearDown(self):
+        """
+        测试后清理
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_save_and_reopen(self):
+        """
+        测试持久连接保存的反馈在重新打开数据库后可以读取，处理历史一并保存
+        """
+        storage = SQLiteStorage(self.db_path)
+        feedback = create_feedback("患者头痛", tags=['t'])
+        feedback.metadata.add_processing_record('NoiseFilterProcessor', '2024-01-01T12:00:00', 'noise_filtering')
+        self.assertTrue(storage.save(feedback))
+        self.assertTrue(storage.save_batch([create_feedback("患者发热", tags=['t'])]))
+        storage.close()
+        
+        storage = SQLiteStorage(self.db_path)
+        loaded = storage.get(feedback.feedback_id)
+        
+        self.assertEqual(loaded.content.text, "患者头痛")
+        self.assertEqual(loaded.metadata.tags, ['t'])
+        self.assertEqual(loaded.metadata.processing_history[0]['processor'], 'NoiseFilterProcessor')
+        self.assertEqual(len(storage.query(tags=['t'])), 2)
+        storage.close()
+    
+    def test_blob_formats(self):
+        """
+        测试新保存的内容使用msgpack格式，旧版本pickle格式的内容仍可读取
+        """
+        storage = SQLiteStorage(self.db_path)
+        feedback = create_feedback("患者头痛")
+        storage.save(feedback)
+        storage.close()
+        
+        conn = sqlite3.connect(self.db_path)
+        content_blob = conn.execute('SELECT content FROM feedbacks WHERE feedback_id = ?',
+                                    (feedback.feedback_id,)).fetchone()[0]
+        self.assertIn(content_blob[:1], (b'\x01', b'\x80'))
+        
+        conn.execute('UPDATE feedbacks SET content = ? WHERE feedback_id = ?',
+                     (pickle.dumps(TextContent(text="旧格式内容")), feedback.feedback_id))
+        conn.commit()
+        conn.close()
+        
+        storage = SQLiteStorage(self.db_path)
+        self.assertEqual(storage.get(feedback.feedback_id).content.text, "旧格式内容")
+        storage.close()
+
+
+class TestVersionControlStorage(unittest.TestCase):
+    """
+    测试版本控制存储
+    """
+    
+    def setUp(self):
+        """
+        测试前准备
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'feedback.db')
+    
+    def tearDown(self):
+        """
+        测试后清理
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_version_history_survives_restart(self):
+        """
+        测试重新打开版本历史数据库后历史记录仍然存在，并继续递增版本号
+        """
+        base_storage = SQLiteStorage(self.db_path)
+        storage = VersionControlStorage(base_storage)
+        feedback = create_feedback("患者头痛")
+        storage.save(feedback)
+        feedback.content.text = "患者头痛缓解"
+        storage.save(feedback)
+        history_path = storage.history_path
+        storage.close()
+        base_storage.close()
+        
+        base_storage = SQLiteStorage(self.db_path)
+        storage = VersionControlStorage(base_storage, history_path=history_path)
+        history = storage.get_version_history(feedback.feedback_id)
+        
+        self.assertEqual(history['current_version'], 2)
+        self.assertEqual(history['versions'][0]['changes']['type'], 'create')
+        self.assertEqual(history['versions'][1]['changes']['type'], 'update')
+        self.assertIn('content', history['versions'][1]['changes']['details'])
+        
+        feedback.content.text = "患者头痛消失"
+        self.assertTrue(storage.save(feedback))
+        self.assertEqual(storage.get_version_history(feedback.feedback_id)['current_version'], 3)
+        
+        storage.close()
+        base_storage.close()
+    
+    def test_delete_clears_version_history(self):
+        """
+        测试删除反馈后版本号从1重新开始
+        """
+        base_storage = SQLiteStorage(self.db_path)
+        storage = VersionControlStorage(base_storage)
+        feedback = create_feedback("患者头痛")
+        storage.save(feedback)
+        storage.save(feedback)
+        
+        self.assertTrue(storage.delete(feedback.feedback_id))
+        self.assertIsNone(storage.get_version_history(feedback.feedback_id))
+        
+        storage.save(feedback)
+        self.assertEqual(storage.get_version_history(feedback.feedback_id)['current_version'], 1)
+        
+        storage.close()
+        base_storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()